@@ -1,16 +1,25 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import asyncio
-from typing import List, Dict, Any, Optional
+import dataclasses
+import hashlib
+import multiprocessing
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import os
+import time
 import logging
 import warnings
+import aiohttp
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from cachetools import TTLCache
 
 # Suppress aiohttp TLS-in-TLS warning for HTTPS proxy usage
 # The proxy works correctly despite the warning
@@ -19,23 +28,26 @@ warnings.filterwarnings('ignore', message='.*HTTPS.*proxy.*TLS in TLS.*')
 from database import Database
 from scraper import PinnacleScraper, CS500Scraper
 from scraper_playwright import CS500ScraperPlaywright
-from functions import find_best_match, infer_sport_from_pinnacle_event, infer_sport_from_cs500_event
+from functions import find_best_match, build_candidate_blocks, candidate_games, warm_up_model
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
-app = FastAPI(title="Esports Betting EV Finder", version="1.0.0")
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# orjson serializes the large market payloads several times faster than the stdlib encoder
+app = FastAPI(title="Esports Betting EV Finder", version="1.0.0", default_response_class=ORJSONResponse)
+
+# CORS middleware - the dashboard is served from the same origin, so only enable it for
+# explicitly configured cross-origin clients (comma-separated CORS_ORIGINS)
+cors_origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
+if cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Initialize database and scrapers
 db = Database()
@@ -53,7 +65,8 @@ PINNACLE_CONFIG = {
     "markets_url": "https://guest.api.arcadia.pinnacle.com/0.1/sports/12/markets/straight?primaryOnly=false&withSpecials=true&withThreeWaySpecials=true&moneylineOnly=true",
     "headers": {
         "Accept": "application/json",
-        "Accept-Encoding": "gzip, deflate, br, zstd",
+        # Only encodings aiohttp can decode (br via Brotli); aiohttp 3.9 has no zstd decoder
+        "Accept-Encoding": "gzip, deflate, br",
         "Cache-Control": "no-cache",
         "Connection": "keep-alive",
         "Content-Type": "application/json",
@@ -73,14 +86,208 @@ PINNACLE_CONFIG = {
 # Initialize scheduler
 scheduler = AsyncIOScheduler()
 scheduler_running = False
-scheduler_config = {
-    "enabled": False,
-    "pinnacle_interval": 5,  # minutes
-    "cs500_interval": 5,     # minutes
-    "last_pinnacle_scrape": None,
-    "last_cs500_scrape": None,
-    "last_match": None
-}
+
+
+@dataclasses.dataclass(slots=True)
+class SchedulerState:
+    """Scheduler settings and last-run times shared by the scheduled tasks."""
+    enabled: bool = False
+    pinnacle_interval: int = 5  # minutes
+    cs500_interval: int = 5     # minutes
+    # Unix timestamps, formatted only when reported by /api/scheduler/status
+    last_pinnacle_scrape: Optional[float] = None
+    last_cs500_scrape: Optional[float] = None
+    last_match: Optional[float] = None
+
+
+scheduler_state = SchedulerState()
+
+
+# Short-lived cache for dashboard reads, cleared whenever scraping or matching changes the data
+_markets_cache = TTLCache(maxsize=128, ttl=30)
+# One [lock, users] entry per key being computed, so concurrent misses share a single DB read.
+# The entry is dropped only when its last user leaves, so a late caller can't get a second lock.
+_cache_locks: Dict[tuple, list] = {}
+# Bumped on invalidation so reads that straddle a data change are not cached
+_cache_generation = 0
+
+
+async def _cached(key: tuple, compute):
+    """Return the cached value for key, computing it in a worker thread on a miss."""
+    try:
+        return _markets_cache[key]
+    except KeyError:
+        pass
+    entry = _cache_locks.get(key)
+    if entry is None:
+        entry = _cache_locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            try:
+                return _markets_cache[key]
+            except KeyError:
+                pass
+            generation = _cache_generation
+            value = await asyncio.to_thread(compute)
+            if generation == _cache_generation:
+                _markets_cache[key] = value
+            return value
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _cache_locks[key]
+
+
+def invalidate_markets_cache():
+    """Drop cached dashboard reads after market data changes."""
+    global _cache_generation
+    _cache_generation += 1
+    _markets_cache.clear()
+
+
+# Hash of the last stored payload per source, so unchanged scrapes skip the DB rewrite
+_payload_hashes: Dict[str, Optional[str]] = {"pinnacle": None, "cs500": None}
+
+
+async def _store_if_changed(source: str, markets: List[Dict[str, Any]], store) -> bool:
+    """Store scraped markets unless they are identical to the last stored payload.
+    
+    Skipped rows keep their scraped_at, which therefore means "last changed"; the last
+    successful scrape of either kind is recorded in scheduler_state (last_<source>_scrape).
+    Returns True if the markets were stored.
+    """
+    payload_hash = hashlib.blake2b(orjson.dumps(markets, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    if payload_hash == _payload_hashes[source]:
+        logger.info(f"⏭️ {source} markets unchanged, skipping store")
+        setattr(scheduler_state, f"last_{source}_scrape", time.time())
+        return False
+    await asyncio.to_thread(store, markets)
+    invalidate_markets_cache()
+    # Only record the hash once the store succeeded
+    _payload_hashes[source] = payload_hash
+    setattr(scheduler_state, f"last_{source}_scrape", time.time())
+    return True
+
+
+# find_best_match results for the current CS500 candidate set, keyed by Pinnacle game.
+# Repeat scheduler runs skip games that were already scored against unchanged candidates.
+_match_cache: Dict[tuple, Tuple[Optional[str], float]] = {}
+_match_cache_candidates: Optional[tuple] = None
+
+# Worker processes for the CPU-bound matching pass, sized to the CPUs this process may run on
+# (not the host's core count) and capped low, since every worker holds its own copy of the model
+MATCH_WORKERS_MAX = 2
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0")) or min(
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1),
+    MATCH_WORKERS_MAX,
+)
+# Created in the startup hook, and rebuilt if a worker dies
+_match_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _new_match_pool() -> ProcessPoolExecutor:
+    """Start a matching pool whose workers each load the model on spin-up."""
+    # Spawned rather than forked: by now the process has event-loop and to_thread threads,
+    # a Playwright driver and open SQLite connections, none of which survive a fork safely
+    return ProcessPoolExecutor(
+        max_workers=MATCH_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=warm_up_model,
+    )
+
+
+async def _score_in_pool(pending: List[tuple], blocks, cs500_games: List[Dict[str, Any]]) -> list:
+    """Run find_best_match for each pending game in the pool, rebuilding it once if it broke.
+    
+    A worker that dies (or whose model load fails) breaks the whole pool for good, so the
+    broken pool is replaced rather than failing every later pass until a restart.
+    """
+    global _match_pool
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        try:
+            return await asyncio.gather(*[
+                loop.run_in_executor(_match_pool, find_best_match, p_game, candidate_games(p_game, blocks, cs500_games))
+                for _, p_game in pending
+            ])
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️ Matching pool broke ({e}), starting a new one")
+            _match_pool.shutdown(wait=False, cancel_futures=True)
+            _match_pool = _new_match_pool()
+            if attempt:
+                raise
+
+
+def _build_cs500_games(cs500_markets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert CS500 markets to the format expected by the matching function."""
+    return [
+        {
+            "home_team": c_market["home_team"],
+            "away_team": c_market["away_team"],
+            "event_name": c_market["event_name"],
+            "start_time": c_market.get("start_time"),
+            "match_id": c_market["match_id"]
+        }
+        for c_market in cs500_markets
+    ]
+
+
+async def _match_pinnacle_markets(pinnacle_markets: List[Dict[str, Any]], cs500_markets: List[Dict[str, Any]]) -> int:
+    """Run AI matching for the given Pinnacle markets and store confident mappings.
+    
+    Uncached games are scored in worker processes so matching does not block the event loop.
+    Returns the number of mappings stored.
+    """
+    global _match_cache_candidates
+    
+    # Build the candidate list once per matching pass
+    cs500_games = _build_cs500_games(cs500_markets)
+    candidates_key = tuple(tuple(g.values()) for g in cs500_games)
+    if candidates_key != _match_cache_candidates:
+        _match_cache.clear()
+        _match_cache_candidates = candidates_key
+    
+    # Only score candidates sharing a team or start-time block with each Pinnacle game
+    blocks = build_candidate_blocks(cs500_games)
+    
+    # Convert Pinnacle markets to format expected by matching function
+    p_games = {}
+    for p_market in pinnacle_markets:
+        p_game = {
+            "home_team": p_market["home_team"],
+            "away_team": p_market["away_team"],
+            "event": p_market["event"],
+            "start_time": p_market.get("start_time")
+        }
+        p_games.setdefault(tuple(p_game.values()), p_game)
+    
+    scored = {key: _match_cache[key] for key in p_games if key in _match_cache}
+    pending = [(key, p_game) for key, p_game in p_games.items() if key not in scored]
+    
+    # Find best matches using AI for games not scored against these candidates yet
+    if pending:
+        results = await _score_in_pool(pending, blocks, cs500_games)
+        new_scores = {
+            key: (best_match["match_id"] if best_match else None, confidence)
+            for (key, _), (best_match, confidence) in zip(pending, results)
+        }
+        scored.update(new_scores)
+        # Another pass may have replaced the candidate set while we were waiting
+        if _match_cache_candidates == candidates_key:
+            _match_cache.update(new_scores)
+    
+    mappings = []
+    
+    for p_market in pinnacle_markets:
+        game_key = (p_market["home_team"], p_market["away_team"], p_market["event"], p_market.get("start_time"))
+        match_id, confidence = scored[game_key]
+        
+        if match_id and confidence > 0.6:
+            mappings.append((p_market["id"], match_id, confidence))
+    
+    await asyncio.to_thread(db.store_match_mappings_bulk, mappings)
+    return len(mappings)
 
 
 # Scheduled scraping tasks
@@ -88,7 +295,7 @@ async def scheduled_scrape_pinnacle():
     """Background task to scrape Pinnacle on schedule."""
     try:
         logger.info("🔄 Scheduled Pinnacle scrape started")
-        markets_data = pinnacle_scraper.scrape_data(
+        markets_data = await pinnacle_scraper.scrape_data(
             PINNACLE_CONFIG["api_url"],
             PINNACLE_CONFIG["matchups_url"],
             PINNACLE_CONFIG["markets_url"],
@@ -96,9 +303,8 @@ async def scheduled_scrape_pinnacle():
         )
         
         markets = markets_data.get('markets', [])
-        db.store_pinnacle_markets(markets)
+        await _store_if_changed("pinnacle", markets, db.store_pinnacle_markets)
         
-        scheduler_config["last_pinnacle_scrape"] = datetime.now().isoformat()
         logger.info(f"✅ Scheduled Pinnacle scrape completed: {len(markets)} markets")
     except Exception as e:
         logger.error(f"❌ Scheduled Pinnacle scrape failed: {str(e)}")
@@ -108,16 +314,15 @@ async def scheduled_scrape_cs500():
     """Background task to scrape CS500 on schedule."""
     try:
         logger.info("🔄 Scheduled CS500 scrape started")
-        match_ids = db.get_cs500_match_ids()
+        match_ids = await asyncio.to_thread(db.get_cs500_match_ids)
         
         if not match_ids:
             logger.warning("⚠️ No CS500 match IDs available for scheduled scrape")
             return
         
         markets = await cs500_scraper.get_markets(match_ids)
-        db.store_cs500_markets(markets)
+        await _store_if_changed("cs500", markets, db.store_cs500_markets)
         
-        scheduler_config["last_cs500_scrape"] = datetime.now().isoformat()
         logger.info(f"✅ Scheduled CS500 scrape completed: {len(markets)} markets")
     except Exception as e:
         logger.error(f"❌ Scheduled CS500 scrape failed: {str(e)}")
@@ -127,43 +332,15 @@ async def scheduled_match_markets():
     """Background task to match markets on schedule."""
     try:
         logger.info("🔄 Scheduled market matching started")
-        pinnacle_markets = db.get_active_pinnacle_markets()
-        cs500_markets = db.get_active_cs500_markets()
-        
-        already_mapped_ids = db.get_mapped_pinnacle_ids()
-        unmapped_markets = [m for m in pinnacle_markets if m["id"] not in already_mapped_ids]
+        # Exact canonical-name pairs are mapped in SQL; AI matching handles the rest
+        exact_count = await asyncio.to_thread(db.map_exact_canonical_matches)
+        unmapped_markets = await asyncio.to_thread(db.get_unmapped_pinnacle_markets)
+        cs500_markets = await asyncio.to_thread(db.get_active_cs500_markets)
         
-        matched_count = 0
+        matched_count = exact_count + await _match_pinnacle_markets(unmapped_markets, cs500_markets)
         
-        for p_market in unmapped_markets:
-            p_game = {
-                "home_team": p_market["home_team"],
-                "away_team": p_market["away_team"],
-                "event": p_market["event"],
-                "start_time": p_market.get("start_time")
-            }
-            
-            cs500_games = []
-            for c_market in cs500_markets:
-                cs500_games.append({
-                    "home_team": c_market["home_team"],
-                    "away_team": c_market["away_team"],
-                    "event_name": c_market["event_name"],
-                    "start_time": c_market.get("start_time"),
-                    "match_id": c_market["match_id"]
-                })
-            
-            best_match, confidence = find_best_match(p_game, cs500_games)
-            
-            if best_match and confidence > 0.6:
-                db.store_match_mapping(
-                    p_market["id"],
-                    best_match["match_id"],
-                    confidence
-                )
-                matched_count += 1
-        
-        scheduler_config["last_match"] = datetime.now().isoformat()
+        invalidate_markets_cache()
+        scheduler_state.last_match = time.time()
         logger.info(f"✅ Scheduled matching completed: {matched_count} new matches")
     except Exception as e:
         logger.error(f"❌ Scheduled matching failed: {str(e)}")
@@ -173,34 +350,40 @@ async def scheduled_capture_closing_lines():
     """Background task to capture closing lines for markets near start time."""
     try:
         logger.info("🔄 Capturing closing lines")
-        count = db.capture_closing_lines()
+        count = await asyncio.to_thread(db.capture_closing_lines)
         if count > 0:
             logger.info(f"✅ Captured closing lines for {count} markets")
             # Update CLV for any bets on those markets
-            clv_count = db.update_all_pending_clv()
+            clv_count = await asyncio.to_thread(db.update_all_pending_clv)
             if clv_count > 0:
                 logger.info(f"✅ Updated CLV for {clv_count} bets")
         
         # Delete matches that have started but have no EV data
-        deleted = db.delete_started_matches_without_ev()
+        deleted = await asyncio.to_thread(db.delete_started_matches_without_ev)
         if deleted > 0:
             logger.info(f"🗑️ Deleted {deleted} started matches without EV data")
+        invalidate_markets_cache()
     except Exception as e:
         logger.error(f"❌ Closing line capture failed: {str(e)}")
 
 
-async def scheduled_scrape_all():
-    """Combined scheduled task: scrape both sources and match."""
-    await scheduled_scrape_pinnacle()
-    await scheduled_scrape_cs500()
-    await scheduled_match_markets()
-    await scheduled_capture_closing_lines()
+# Scheduled jobs (id, task, jitter seconds). Each runs on its own trigger with a
+# distinct jitter so the scrapes, matching and closing-line capture don't burst together.
+SCHEDULED_JOBS = [
+    ("auto_scrape_pinnacle", scheduled_scrape_pinnacle, 15),
+    ("auto_scrape_cs500", scheduled_scrape_cs500, 30),
+    ("auto_match", scheduled_match_markets, 45),
+    ("auto_closing_lines", scheduled_capture_closing_lines, 20),
+]
 
 
 @app.on_event("startup")
 async def startup_event():
     """Start the scheduler when the app starts."""
-    global scheduler_running
+    global scheduler_running, _match_pool
+    _match_pool = _new_match_pool()
+    # Shared HTTP session so outbound API calls reuse pooled connections
+    app.state.http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
     if not scheduler_running:
         scheduler.start()
         scheduler_running = True
@@ -209,12 +392,19 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Shutdown the scheduler when the app stops."""
+    """Shutdown the scheduler and release shared resources when the app stops."""
     global scheduler_running
     if scheduler_running:
         scheduler.shutdown()
         scheduler_running = False
         logger.info("📅 Scheduler shutdown")
+    if _match_pool is not None:
+        _match_pool.shutdown(cancel_futures=True)
+    cs500_scraper.close()
+    await pinnacle_scraper.close()
+    await cs500_playwright_scraper.aclose()
+    await app.state.http.close()
+    await asyncio.to_thread(db.close_pool)
 
 
 @app.get("/")
@@ -229,23 +419,21 @@ async def check_railway_ip():
     Check Railway's outbound IP address by calling ipify.org.
     This is the IP that needs to be whitelisted at ProxyScrape.
     """
-    import aiohttp
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get('https://api.ipify.org?format=json', timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return {
-                        "status": "success",
-                        "railway_ip": data.get("ip"),
-                        "message": f"Railway's outbound IP is: {data.get('ip')}",
-                        "instruction": "Whitelist this IP address in your ProxyScrape dashboard"
-                    }
-                else:
-                    return {
-                        "status": "error",
-                        "message": f"Failed to check IP: HTTP {response.status}"
-                    }
+        async with app.state.http.get('https://api.ipify.org?format=json') as response:
+            if response.status == 200:
+                data = await response.json()
+                return {
+                    "status": "success",
+                    "railway_ip": data.get("ip"),
+                    "message": f"Railway's outbound IP is: {data.get('ip')}",
+                    "instruction": "Whitelist this IP address in your ProxyScrape dashboard"
+                }
+            else:
+                return {
+                    "status": "error",
+                    "message": f"Failed to check IP: HTTP {response.status}"
+                }
     except Exception as e:
         return {
             "status": "error",
@@ -268,36 +456,64 @@ async def archive_page():
 @app.post("/cs500_matchids")
 async def receive_cs500_matchids(match_ids: List[str]):
     """Receive CS500 match IDs from the scraper."""
-    db.store_cs500_match_ids(match_ids)
+    await asyncio.to_thread(db.store_cs500_match_ids, match_ids)
     return {"status": "success", "count": len(match_ids), "match_ids": match_ids}
 
 
 @app.get("/api/cs500_matchids")
 async def get_cs500_matchids():
     """Get all stored CS500 match IDs."""
-    match_ids = db.get_cs500_match_ids()
+    match_ids = await asyncio.to_thread(db.get_cs500_match_ids)
     return {"count": len(match_ids), "match_ids": match_ids}
 
 
+async def _do_scrape_pinnacle() -> Dict[str, Any]:
+    """Scrape Pinnacle markets and store them."""
+    markets_data = await pinnacle_scraper.scrape_data(
+        PINNACLE_CONFIG["api_url"],
+        PINNACLE_CONFIG["matchups_url"],
+        PINNACLE_CONFIG["markets_url"],
+        PINNACLE_CONFIG["headers"]
+    )
+    
+    markets = markets_data.get('markets', [])
+    await _store_if_changed("pinnacle", markets, db.store_pinnacle_markets)
+    
+    return {
+        "status": "success",
+        "message": f"Scraped {len(markets)} Pinnacle markets",
+        "count": len(markets)
+    }
+
+
+async def _do_scrape_cs500() -> Dict[str, Any]:
+    """Scrape CS500 markets using existing match IDs in database."""
+    # Get match IDs from database
+    match_ids = await asyncio.to_thread(db.get_cs500_match_ids)
+    
+    if not match_ids:
+        return {
+            "status": "warning",
+            "message": "No CS500 match IDs available. Run /api/scrape/cs500-matchids first.",
+            "count": 0
+        }
+    
+    # Fetch markets for the match IDs
+    markets = await cs500_scraper.get_markets(match_ids)
+    await _store_if_changed("cs500", markets, db.store_cs500_markets)
+    
+    return {
+        "status": "success",
+        "message": f"Scraped {len(markets)} CS500 markets",
+        "count": len(markets)
+    }
+
+
 @app.post("/api/scrape/pinnacle")
 async def scrape_pinnacle(background_tasks: BackgroundTasks):
     """Scrape Pinnacle markets and store them."""
     try:
-        markets_data = pinnacle_scraper.scrape_data(
-            PINNACLE_CONFIG["api_url"],
-            PINNACLE_CONFIG["matchups_url"],
-            PINNACLE_CONFIG["markets_url"],
-            PINNACLE_CONFIG["headers"]
-        )
-        
-        markets = markets_data.get('markets', [])
-        db.store_pinnacle_markets(markets)
-        
-        return {
-            "status": "success",
-            "message": f"Scraped {len(markets)} Pinnacle markets",
-            "count": len(markets)
-        }
+        return await _do_scrape_pinnacle()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to scrape Pinnacle: {str(e)}")
 
@@ -322,7 +538,7 @@ async def scrape_cs500_matchids():
             }
         
         # Store match IDs in database
-        db.store_cs500_match_ids(list(match_ids))
+        await asyncio.to_thread(db.store_cs500_match_ids, list(match_ids))
         
         logger.info(f"✅ Collected {len(match_ids)} CS500 match IDs")
         
@@ -341,25 +557,7 @@ async def scrape_cs500_matchids():
 async def scrape_cs500(background_tasks: BackgroundTasks):
     """Scrape CS500 markets using existing match IDs in database."""
     try:
-        # Get match IDs from database
-        match_ids = db.get_cs500_match_ids()
-        
-        if not match_ids:
-            return {
-                "status": "warning",
-                "message": "No CS500 match IDs available. Run /api/scrape/cs500-matchids first.",
-                "count": 0
-            }
-        
-        # Fetch markets for the match IDs
-        markets = await cs500_scraper.get_markets(match_ids)
-        db.store_cs500_markets(markets)
-        
-        return {
-            "status": "success",
-            "message": f"Scraped {len(markets)} CS500 markets",
-            "count": len(markets)
-        }
+        return await _do_scrape_cs500()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to scrape CS500: {str(e)}")
 
@@ -378,13 +576,13 @@ async def _run_cs500_full_scrape():
             return
         
         # Store match IDs
-        db.store_cs500_match_ids(list(match_ids))
+        await asyncio.to_thread(db.store_cs500_match_ids, list(match_ids))
         logger.info(f"✅ Collected {len(match_ids)} match IDs")
         
         # Step 2: Scrape markets for those IDs
         logger.info("Step 2: Scraping markets...")
         markets = await cs500_scraper.get_markets(match_ids)
-        db.store_cs500_markets(markets)
+        await _store_if_changed("cs500", markets, db.store_cs500_markets)
         logger.info(f"✅ Scraped {len(markets)} markets")
         
     except Exception as e:
@@ -424,49 +622,25 @@ async def match_markets():
     This avoids re-matching already paired games and saves computation.
     """
     try:
-        pinnacle_markets = db.get_active_pinnacle_markets()
-        cs500_markets = db.get_active_cs500_markets()
+        pinnacle_markets = await asyncio.to_thread(db.get_active_pinnacle_markets)
+        cs500_markets = await asyncio.to_thread(db.get_active_cs500_markets)
         
         # Get all Pinnacle IDs that already have mappings
-        already_mapped_ids = db.get_mapped_pinnacle_ids()
+        already_mapped_ids = await asyncio.to_thread(db.get_mapped_pinnacle_ids)
+        skipped_count = len(already_mapped_ids)
+        
+        # Exact canonical-name pairs are mapped in SQL without the AI matcher
+        exact_count = await asyncio.to_thread(db.map_exact_canonical_matches)
+        if exact_count:
+            already_mapped_ids = await asyncio.to_thread(db.get_mapped_pinnacle_ids)
         
         # Filter to only unmapped Pinnacle markets
         unmapped_markets = [m for m in pinnacle_markets if m["id"] not in already_mapped_ids]
         
-        matched_count = 0
-        skipped_count = len(already_mapped_ids)
-        
         # Only run AI matching on unmapped markets
-        for p_market in unmapped_markets:
-            # Convert Pinnacle market to format expected by matching function
-            p_game = {
-                "home_team": p_market["home_team"],
-                "away_team": p_market["away_team"],
-                "event": p_market["event"],
-                "start_time": p_market.get("start_time")
-            }
-            
-            # Convert CS500 markets to format expected by matching function
-            cs500_games = []
-            for c_market in cs500_markets:
-                cs500_games.append({
-                    "home_team": c_market["home_team"],
-                    "away_team": c_market["away_team"],
-                    "event_name": c_market["event_name"],
-                    "start_time": c_market.get("start_time"),
-                    "match_id": c_market["match_id"]
-                })
-            
-            # Find best match using AI
-            best_match, confidence = find_best_match(p_game, cs500_games)
-            
-            if best_match and confidence > 0.6:
-                db.store_match_mapping(
-                    p_market["id"],
-                    best_match["match_id"],
-                    confidence
-                )
-                matched_count += 1
+        matched_count = exact_count + await _match_pinnacle_markets(unmapped_markets, cs500_markets)
+        
+        invalidate_markets_cache()
         
         return {
             "status": "success",
@@ -481,44 +655,41 @@ async def match_markets():
         raise HTTPException(status_code=500, detail=f"Failed to match markets: {str(e)}")
 
 
+def _load_markets(min_ev: float, sport: Optional[str]) -> List[Dict[str, Any]]:
+    # Filtering by sport / minimum EV and sorting by best EV happen in SQL
+    return db.get_matched_markets(sport=sport, min_ev=min_ev if min_ev > 0 else None, order_by_ev=True)
+
+
+async def _stream_markets(markets: List[Dict[str, Any]]):
+    """Yield the markets response body one encoded market at a time."""
+    yield b'{"status":"success","count":%d,"markets":[' % len(markets)
+    for i, market in enumerate(markets):
+        if i:
+            yield b','
+        yield orjson.dumps(market)
+    yield b']}'
+
+
 @app.get("/api/markets")
 async def get_markets(min_ev: float = 0.0, sport: Optional[str] = None):
     """Get all matched markets with EV calculations."""
     try:
-        markets = db.get_matched_markets()
+        markets = await _cached(("markets", min_ev, sport), lambda: _load_markets(min_ev, sport))
         
-        # Filter by sport if specified
-        if sport:
-            markets = [m for m in markets if m.get('sport') == sport]
-        
-        # Filter by minimum EV
-        if min_ev > 0:
-            markets = [m for m in markets if m['home_ev_pct'] >= min_ev or m['away_ev_pct'] >= min_ev]
-        
-        # Sort by best EV descending
-        markets.sort(key=lambda x: x.get('best_ev_pct', -100), reverse=True)
-        
-        return {
-            "status": "success",
-            "count": len(markets),
-            "markets": markets
-        }
+        return StreamingResponse(_stream_markets(markets), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get markets: {str(e)}")
 
 
+def _load_positive_ev_markets(min_ev: float, sport: Optional[str]) -> List[Dict[str, Any]]:
+    return db.get_positive_ev_markets(min_ev, sport)
+
+
 @app.get("/api/markets/positive")
 async def get_positive_ev_markets(min_ev: float = 0.0, sport: Optional[str] = None):
     """Get only markets with positive EV."""
     try:
-        markets = db.get_positive_ev_markets(min_ev)
-        
-        # Filter by sport if specified
-        if sport:
-            markets = [m for m in markets if m.get('sport') == sport]
-        
-        # Sort by best EV descending
-        markets.sort(key=lambda x: x.get('best_ev_pct', 0), reverse=True)
+        markets = await _cached(("positive", min_ev, sport), lambda: _load_positive_ev_markets(min_ev, sport))
         
         return {
             "status": "success",
@@ -533,7 +704,7 @@ async def get_positive_ev_markets(min_ev: float = 0.0, sport: Optional[str] = No
 async def get_unmatched_markets():
     """Get markets that haven't been matched yet."""
     try:
-        unmatched = db.get_unmatched_markets()
+        unmatched = await asyncio.to_thread(db.get_unmatched_markets)
         
         return {
             "status": "success",
@@ -547,28 +718,28 @@ async def get_unmatched_markets():
         raise HTTPException(status_code=500, detail=f"Failed to get unmatched markets: {str(e)}")
 
 
+def _load_stats() -> Dict[str, Any]:
+    counts = db.get_stats_counts()
+    
+    return {
+        "pinnacle_count": counts["pinnacle_count"],
+        "cs500_count": counts["cs500_count"],
+        "matched_count": counts["matched_count"],
+        "positive_ev_count": counts["positive_ev_count"],
+        "unmatched_pinnacle_count": counts["unmatched_pinnacle_count"],
+        "unmatched_cs500_count": counts["unmatched_cs500_count"],
+        "sports": {
+            "cs2": counts["cs2_count"],
+            "lol": counts["lol_count"]
+        }
+    }
+
+
 @app.get("/api/stats")
 async def get_stats():
     """Get statistics about the current data."""
     try:
-        pinnacle_markets = db.get_active_pinnacle_markets()
-        cs500_markets = db.get_active_cs500_markets()
-        matched_markets = db.get_matched_markets()
-        positive_ev_markets = db.get_positive_ev_markets()
-        unmatched = db.get_unmatched_markets()
-        
-        return {
-            "pinnacle_count": len(pinnacle_markets),
-            "cs500_count": len(cs500_markets),
-            "matched_count": len(matched_markets),
-            "positive_ev_count": len(positive_ev_markets),
-            "unmatched_pinnacle_count": unmatched["pinnacle_count"],
-            "unmatched_cs500_count": unmatched["cs500_count"],
-            "sports": {
-                "cs2": len([m for m in matched_markets if m.get('sport') == 'cs2']),
-                "lol": len([m for m in matched_markets if m.get('sport') == 'lol'])
-            }
-        }
+        return await _cached(("stats",), _load_stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
 
@@ -578,19 +749,20 @@ async def scrape_all():
     """Scrape both Pinnacle and CS500, then match markets."""
     results = {}
     
-    # Scrape Pinnacle
-    try:
-        pinnacle_result = await scrape_pinnacle(BackgroundTasks())
+    # Scrape Pinnacle and CS500 concurrently (independent upstreams)
+    pinnacle_result, cs500_result = await asyncio.gather(
+        _do_scrape_pinnacle(), _do_scrape_cs500(), return_exceptions=True
+    )
+    
+    if isinstance(pinnacle_result, Exception):
+        results['pinnacle'] = {"status": "error", "message": f"Failed to scrape Pinnacle: {str(pinnacle_result)}"}
+    else:
         results['pinnacle'] = pinnacle_result
-    except Exception as e:
-        results['pinnacle'] = {"status": "error", "message": str(e)}
     
-    # Scrape CS500
-    try:
-        cs500_result = await scrape_cs500(BackgroundTasks())
+    if isinstance(cs500_result, Exception):
+        results['cs500'] = {"status": "error", "message": f"Failed to scrape CS500: {str(cs500_result)}"}
+    else:
         results['cs500'] = cs500_result
-    except Exception as e:
-        results['cs500'] = {"status": "error", "message": str(e)}
     
     # Match markets
     try:
@@ -610,7 +782,10 @@ async def scrape_all():
 async def clear_data():
     """Clear all data from the database."""
     try:
-        db.clear_all_data()
+        await asyncio.to_thread(db.clear_all_data)
+        invalidate_markets_cache()
+        # Force the next scrape to be stored even if upstream is unchanged
+        _payload_hashes.update(pinnacle=None, cs500=None)
         return {
             "status": "success",
             "message": "All data cleared successfully"
@@ -624,41 +799,17 @@ async def rematch_markets():
     """Clear existing mappings and re-run matching with improved algorithm."""
     try:
         # Clear existing mappings
-        db.clear_match_mappings()
+        await asyncio.to_thread(db.clear_match_mappings)
         
-        # Re-run matching
-        pinnacle_markets = db.get_active_pinnacle_markets()
-        cs500_markets = db.get_active_cs500_markets()
+        # Re-run matching: exact canonical-name pairs in SQL, the rest through AI matching
+        exact_count = await asyncio.to_thread(db.map_exact_canonical_matches)
+        pinnacle_markets = await asyncio.to_thread(db.get_active_pinnacle_markets)
+        cs500_markets = await asyncio.to_thread(db.get_active_cs500_markets)
+        unmapped_markets = await asyncio.to_thread(db.get_unmapped_pinnacle_markets)
         
-        matched_count = 0
+        matched_count = exact_count + await _match_pinnacle_markets(unmapped_markets, cs500_markets)
         
-        for p_market in pinnacle_markets:
-            p_game = {
-                "home_team": p_market["home_team"],
-                "away_team": p_market["away_team"],
-                "event": p_market["event"],
-                "start_time": p_market.get("start_time")
-            }
-            
-            cs500_games = []
-            for c_market in cs500_markets:
-                cs500_games.append({
-                    "home_team": c_market["home_team"],
-                    "away_team": c_market["away_team"],
-                    "event_name": c_market["event_name"],
-                    "start_time": c_market.get("start_time"),
-                    "match_id": c_market["match_id"]
-                })
-            
-            best_match, confidence = find_best_match(p_game, cs500_games)
-            
-            if best_match and confidence > 0.6:
-                db.store_match_mapping(
-                    p_market["id"],
-                    best_match["match_id"],
-                    confidence
-                )
-                matched_count += 1
+        invalidate_markets_cache()
         
         return {
             "status": "success",
@@ -681,17 +832,20 @@ async def start_scheduler(interval_minutes: int = 5):
         for job in scheduler.get_jobs():
             job.remove()
         
-        # Add new job with specified interval
-        scheduler.add_job(
-            scheduled_scrape_all,
-            trigger=IntervalTrigger(minutes=interval_minutes),
-            id='auto_scrape',
-            replace_existing=True
-        )
+        # Add one job per task with the specified interval
+        for job_id, task, jitter in SCHEDULED_JOBS:
+            scheduler.add_job(
+                task,
+                trigger=IntervalTrigger(minutes=interval_minutes, jitter=jitter),
+                id=job_id,
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
         
-        scheduler_config["enabled"] = True
-        scheduler_config["pinnacle_interval"] = interval_minutes
-        scheduler_config["cs500_interval"] = interval_minutes
+        scheduler_state.enabled = True
+        scheduler_state.pinnacle_interval = interval_minutes
+        scheduler_state.cs500_interval = interval_minutes
         
         logger.info(f"📅 Auto-scraping started: every {interval_minutes} minutes")
         
@@ -713,7 +867,7 @@ async def stop_scheduler():
         for job in scheduler.get_jobs():
             job.remove()
         
-        scheduler_config["enabled"] = False
+        scheduler_state.enabled = False
         
         logger.info("📅 Auto-scraping stopped")
         
@@ -726,6 +880,10 @@ async def stop_scheduler():
         raise HTTPException(status_code=500, detail=f"Failed to stop scheduler: {str(e)}")
 
 
+def _format_timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value else None
+
+
 @app.get("/api/scheduler/status")
 async def get_scheduler_status():
     """Get current scheduler status."""
@@ -733,17 +891,19 @@ async def get_scheduler_status():
         jobs = scheduler.get_jobs()
         next_run = None
         
-        if jobs:
-            next_run_time = jobs[0].next_run_time
-            if next_run_time:
-                next_run = next_run_time.isoformat()
+        next_run_times = [job.next_run_time for job in jobs if job.next_run_time]
+        if next_run_times:
+            next_run = min(next_run_times).isoformat()
+        
+        # Read from a snapshot so the fields are consistent while tasks update the state
+        state = dataclasses.replace(scheduler_state)
         
         return {
-            "enabled": scheduler_config["enabled"],
-            "interval_minutes": scheduler_config["pinnacle_interval"],
-            "last_pinnacle_scrape": scheduler_config["last_pinnacle_scrape"],
-            "last_cs500_scrape": scheduler_config["last_cs500_scrape"],
-            "last_match": scheduler_config["last_match"],
+            "enabled": state.enabled,
+            "interval_minutes": state.pinnacle_interval,
+            "last_pinnacle_scrape": _format_timestamp(state.last_pinnacle_scrape),
+            "last_cs500_scrape": _format_timestamp(state.last_cs500_scrape),
+            "last_match": _format_timestamp(state.last_match),
             "next_run": next_run,
             "jobs_count": len(jobs)
         }
@@ -755,15 +915,15 @@ async def get_scheduler_status():
 async def update_scheduler_interval(interval_minutes: int):
     """Update the scheduler interval."""
     try:
-        if scheduler_config["enabled"]:
+        if scheduler_state.enabled:
             # Restart with new interval
             await stop_scheduler()
             await start_scheduler(interval_minutes)
             message = f"Scheduler updated to {interval_minutes} minutes"
         else:
             # Just update config
-            scheduler_config["pinnacle_interval"] = interval_minutes
-            scheduler_config["cs500_interval"] = interval_minutes
+            scheduler_state.pinnacle_interval = interval_minutes
+            scheduler_state.cs500_interval = interval_minutes
             message = f"Interval updated to {interval_minutes} minutes (scheduler not running)"
         
         return {
@@ -805,7 +965,7 @@ class BetUpdateRequest(BaseModel):
 async def place_bet(bet: BetRequest):
     """Place a new bet."""
     try:
-        bet_id = db.place_bet(bet.model_dump())
+        bet_id = await asyncio.to_thread(db.place_bet, bet.model_dump())
         return {
             "status": "success",
             "message": "Bet placed successfully",
@@ -815,16 +975,39 @@ async def place_bet(bet: BetRequest):
         raise HTTPException(status_code=500, detail=f"Failed to place bet: {str(e)}")
 
 
-@app.get("/api/bets")
-async def get_bets():
-    """Get all bets."""
+@app.post("/api/bets/bulk")
+async def place_bets_bulk(bets: List[BetRequest]):
+    """Place several bets at once (e.g. accepting every +EV row)."""
     try:
-        bets = db.get_all_bets()
+        bet_ids = await asyncio.to_thread(db.place_bets_bulk, [bet.model_dump() for bet in bets])
         return {
             "status": "success",
-            "count": len(bets),
-            "bets": bets
+            "message": f"Placed {len(bet_ids)} bets",
+            "bet_ids": bet_ids
         }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to place bets: {str(e)}")
+
+
+def _next_cursor(rows: List[Any], limit: Optional[int], key: str, id_key: str) -> Optional[Dict[str, Any]]:
+    """Keyset cursor for the page after rows, or None when this was the last page."""
+    if not limit or len(rows) < limit:
+        return None
+    return {"before": rows[-1][key], "before_id": rows[-1][id_key]}
+
+
+@app.get("/api/bets")
+async def get_bets(limit: Optional[int] = None, before: Optional[str] = None, before_id: Optional[int] = None):
+    """Get bets, newest first. Pass limit (and the returned next_cursor) to page through them."""
+    try:
+        # SQLite encodes each bet, so the rows are spliced into the body as-is
+        rows = await asyncio.to_thread(db.get_all_bets_json, before, before_id, limit)
+        body = b'{"status":"success","count":%d,"bets":[%s],"next_cursor":%s}' % (
+            len(rows),
+            ",".join(row["bet"] for row in rows).encode(),
+            orjson.dumps(_next_cursor(rows, limit, "placed_at", "id"))
+        )
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get bets: {str(e)}")
 
@@ -833,7 +1016,7 @@ async def get_bets():
 async def get_bet(bet_id: int):
     """Get a specific bet by ID."""
     try:
-        bet = db.get_bet_by_id(bet_id)
+        bet = await asyncio.to_thread(db.get_bet_by_id, bet_id)
         if not bet:
             raise HTTPException(status_code=404, detail="Bet not found")
         return {
@@ -850,11 +1033,11 @@ async def get_bet(bet_id: int):
 async def update_bet(bet_id: int, update: BetUpdateRequest):
     """Update a bet result."""
     try:
-        bet = db.get_bet_by_id(bet_id)
+        bet = await asyncio.to_thread(db.get_bet_by_id, bet_id)
         if not bet:
             raise HTTPException(status_code=404, detail="Bet not found")
         
-        db.update_bet_result(bet_id, update.result, update.actual_return)
+        await asyncio.to_thread(db.update_bet_result, bet_id, update.result, update.actual_return)
         return {
             "status": "success",
             "message": "Bet updated successfully"
@@ -869,7 +1052,7 @@ async def update_bet(bet_id: int, update: BetUpdateRequest):
 async def get_bet_stats():
     """Get bet statistics."""
     try:
-        stats = db.get_bet_stats()
+        stats = await asyncio.to_thread(db.get_bet_stats)
         return {
             "status": "success",
             "stats": stats
@@ -882,7 +1065,7 @@ async def get_bet_stats():
 async def get_match_details(pinnacle_id: str):
     """Get detailed information about a specific match."""
     try:
-        match_details = db.get_match_details(pinnacle_id)
+        match_details = await asyncio.to_thread(db.get_match_details, pinnacle_id)
         if not match_details:
             raise HTTPException(status_code=404, detail="Match not found")
         return {
@@ -899,7 +1082,7 @@ async def get_match_details(pinnacle_id: str):
 async def capture_closing_lines():
     """Manually trigger capturing of closing lines for markets near start time."""
     try:
-        count = db.capture_closing_lines()
+        count = await asyncio.to_thread(db.capture_closing_lines)
         return {
             "status": "success",
             "message": f"Captured closing lines for {count} markets",
@@ -913,7 +1096,7 @@ async def capture_closing_lines():
 async def update_clv():
     """Update CLV for all bets that have closing lines available."""
     try:
-        count = db.update_all_pending_clv()
+        count = await asyncio.to_thread(db.update_all_pending_clv)
         return {
             "status": "success",
             "message": f"Updated CLV for {count} bets",
@@ -927,7 +1110,7 @@ async def update_clv():
 async def update_bet_clv_endpoint(bet_id: int):
     """Update CLV for a specific bet."""
     try:
-        success = db.update_bet_clv(bet_id)
+        success = await asyncio.to_thread(db.update_bet_clv, bet_id)
         if not success:
             return {
                 "status": "warning",
@@ -944,14 +1127,16 @@ async def update_bet_clv_endpoint(bet_id: int):
 
 
 @app.get("/api/archive/matches")
-async def get_archived_matches(sport: Optional[str] = None, limit: Optional[int] = None):
+async def get_archived_matches(sport: Optional[str] = None, limit: Optional[int] = None,
+                               before: Optional[str] = None, before_id: Optional[str] = None):
     """Get all archived matches (past their start time) with closing line data."""
     try:
-        matches = db.get_archived_matches(sport, limit)
+        matches = await asyncio.to_thread(db.get_archived_matches, sport, limit, before, before_id)
         return {
             "status": "success",
             "count": len(matches),
-            "matches": matches
+            "matches": matches,
+            "next_cursor": _next_cursor(matches, limit, "start_time", "pinnacle_id")
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get archived matches: {str(e)}")
@@ -961,7 +1146,7 @@ async def get_archived_matches(sport: Optional[str] = None, limit: Optional[int]
 async def get_archived_match_details_endpoint(pinnacle_id: str):
     """Get detailed information about a specific archived match."""
     try:
-        match_details = db.get_archived_match_details(pinnacle_id)
+        match_details = await asyncio.to_thread(db.get_archived_match_details, pinnacle_id)
         if not match_details:
             raise HTTPException(status_code=404, detail="Archived match not found")
         return {
@@ -978,7 +1163,7 @@ async def get_archived_match_details_endpoint(pinnacle_id: str):
 async def get_archive_stats_endpoint():
     """Get statistics about the archive."""
     try:
-        stats = db.get_archive_stats()
+        stats = await asyncio.to_thread(db.get_archive_stats)
         return {
             "status": "success",
             "stats": stats
@@ -991,7 +1176,8 @@ async def get_archive_stats_endpoint():
 async def clear_archive():
     """Clear all archived matches."""
     try:
-        count = db.clear_archived_matches()
+        count = await asyncio.to_thread(db.clear_archived_matches)
+        invalidate_markets_cache()
         return {
             "status": "success",
             "message": f"Cleared {count} archived matches",
@@ -1005,7 +1191,8 @@ async def clear_archive():
 async def cleanup_matches_without_ev():
     """Manually trigger cleanup of started matches without EV data."""
     try:
-        count = db.delete_started_matches_without_ev()
+        count = await asyncio.to_thread(db.delete_started_matches_without_ev)
+        invalidate_markets_cache()
         return {
             "status": "success",
             "message": f"Deleted {count} matches without EV data",
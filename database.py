@@ -1,35 +1,409 @@
+import atexit
 import sqlite3
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional
 from contextlib import contextmanager
 
+from functions import canonical_team, infer_sport
+
+
+# EV expressions for the matched-markets join, evaluated in the same order as
+# fair_prob * odds - 1 so results match the Python arithmetic exactly.
+# Power method fair odds vs CS500 odds:
+HOME_EV_SQL = "((1.0 / p.home_fair_odds) * c.home_odds - 1)"
+AWAY_EV_SQL = "((1.0 / p.away_fair_odds) * c.away_odds - 1)"
+HOME_EV_PCT_SQL = f"ROUND({HOME_EV_SQL} * 100, 2)"
+AWAY_EV_PCT_SQL = f"ROUND({AWAY_EV_SQL} * 100, 2)"
+BEST_EV_SQL = f"MAX({HOME_EV_SQL}, {AWAY_EV_SQL})"
+# Archived matches may lack fair odds, in which case the fair probability counts as 0
+ARCHIVE_HOME_EV_SQL = "((CASE WHEN p.home_fair_odds THEN 1.0 / p.home_fair_odds ELSE 0 END) * c.home_odds - 1)"
+ARCHIVE_AWAY_EV_SQL = "((CASE WHEN p.away_fair_odds THEN 1.0 / p.away_fair_odds ELSE 0 END) * c.away_odds - 1)"
+# Multiplicative method, falling back to the power method when mult odds are missing
+HAS_MULT_SQL = "(p.home_mult_odds AND p.away_mult_odds)"
+HOME_MULT_EV_SQL = f"(CASE WHEN {HAS_MULT_SQL} THEN (1.0 / p.home_mult_odds) * c.home_odds - 1 ELSE {HOME_EV_SQL} END)"
+AWAY_MULT_EV_SQL = f"(CASE WHEN {HAS_MULT_SQL} THEN (1.0 / p.away_mult_odds) * c.away_odds - 1 ELSE {AWAY_EV_SQL} END)"
+
+# Per-connection tuning for the bursty scrape writes (journal_mode=WAL is persistent, set once)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA busy_timeout = 5000",
+    # Freed pages (e.g. after clearing data) are not zero-filled
+    "PRAGMA secure_delete = OFF",
+    # Checkpoint less often during scrape bursts, then truncate the WAL back to 64 MB
+    "PRAGMA wal_autocheckpoint = 10000",
+    "PRAGMA journal_size_limit = 67108864",
+)
+
+# Scrape upserts update rows in place instead of INSERT OR REPLACE's delete + insert.
+# Columns the scrape doesn't provide are reset just as a REPLACE would, so a re-scraped
+# market gets its closing line re-captured from the latest odds.
+UPSERT_PINNACLE_MARKET_SQL = """
+    INSERT INTO pinnacle_markets 
+    (id, event, sport, home_team, away_team, home_fair_odds, away_fair_odds, home_mult_odds, away_mult_odds, 
+     home_fair_prob, away_fair_prob, home_mult_prob, away_mult_prob, start_time,
+     home_team_canon, away_team_canon, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    ON CONFLICT(id) DO UPDATE SET
+        event = excluded.event,
+        sport = excluded.sport,
+        home_team = excluded.home_team,
+        away_team = excluded.away_team,
+        home_fair_odds = excluded.home_fair_odds,
+        away_fair_odds = excluded.away_fair_odds,
+        home_mult_odds = excluded.home_mult_odds,
+        away_mult_odds = excluded.away_mult_odds,
+        home_fair_prob = excluded.home_fair_prob,
+        away_fair_prob = excluded.away_fair_prob,
+        home_mult_prob = excluded.home_mult_prob,
+        away_mult_prob = excluded.away_mult_prob,
+        start_time = excluded.start_time,
+        home_team_canon = excluded.home_team_canon,
+        away_team_canon = excluded.away_team_canon,
+        home_closing_odds = NULL,
+        away_closing_odds = NULL,
+        closing_captured_at = NULL,
+        scraped_at = CURRENT_TIMESTAMP,
+        is_active = 1
+"""
+
+UPSERT_CS500_MARKET_SQL = """
+    INSERT INTO cs500_markets 
+    (match_id, event_name, sport, home_team, away_team, home_odds, away_odds, start_time, status,
+     home_team_canon, away_team_canon, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    ON CONFLICT(match_id) DO UPDATE SET
+        event_name = excluded.event_name,
+        sport = excluded.sport,
+        home_team = excluded.home_team,
+        away_team = excluded.away_team,
+        home_odds = excluded.home_odds,
+        away_odds = excluded.away_odds,
+        start_time = excluded.start_time,
+        status = excluded.status,
+        home_team_canon = excluded.home_team_canon,
+        away_team_canon = excluded.away_team_canon,
+        scraped_at = CURRENT_TIMESTAMP,
+        is_active = 1
+"""
+
+INSERT_MATCH_MAPPING_SQL = """
+    INSERT OR REPLACE INTO match_mappings (pinnacle_id, cs500_match_id, confidence_score)
+    VALUES (?, ?, ?)
+"""
+
+# Map unmapped active Pinnacle markets to the active CS500 market with the same canonical
+# team pair, the one starting closest when there are several (e.g. a rematch)
+INSERT_EXACT_CANONICAL_MAPPINGS_SQL = """
+    INSERT OR REPLACE INTO match_mappings (pinnacle_id, cs500_match_id, confidence_score)
+    SELECT pinnacle_id, cs500_match_id, 1.0 FROM (
+        SELECT p.id as pinnacle_id, c.match_id as cs500_match_id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY p.id
+                   ORDER BY abs(julianday(c.start_time) - julianday(p.start_time)) IS NULL,
+                            abs(julianday(c.start_time) - julianday(p.start_time))
+               ) as rank
+        FROM pinnacle_markets p
+        JOIN cs500_markets c
+            ON c.home_team_canon = p.home_team_canon
+            AND c.away_team_canon = p.away_team_canon
+            AND c.is_active = 1
+        WHERE p.is_active = 1
+        AND p.home_team_canon != '' AND p.away_team_canon != ''
+        AND NOT EXISTS (SELECT 1 FROM match_mappings m WHERE m.pinnacle_id = p.id)
+    )
+    WHERE rank = 1
+"""
+
+# Active Pinnacle markets without a mapping (NOT EXISTS stops at the first mapping)
+UNMATCHED_PINNACLE_SQL = """
+    SELECT p.*
+    FROM pinnacle_markets p
+    WHERE p.is_active = 1
+    AND NOT EXISTS (SELECT 1 FROM match_mappings m WHERE m.pinnacle_id = p.id)
+    ORDER BY p.start_time
+"""
+
+INSERT_BET_SQL = """
+    INSERT INTO bets (
+        pinnacle_id, event, sport, home_team, away_team,
+        bet_side, bet_team, odds, stake, expected_value,
+        ev_percentage, fair_odds, potential_return, potential_profit,
+        start_time, notes
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+"""
+
+# CLV from each bet's closing line: clv is the implied-probability gain in percentage points,
+# clv_percentage the odds difference. {bet_filter} restricts which bets (alias b) are updated.
+UPDATE_BET_CLV_SQL = """
+    UPDATE bets
+    SET closing_odds = c.closing,
+        clv = (1.0 / c.closing - 1.0 / bets.odds) * 100,
+        clv_percentage = ((bets.odds - c.closing) / c.closing) * 100
+    FROM (
+        SELECT b.id,
+               CASE WHEN b.bet_side = 'home' THEN p.home_closing_odds ELSE p.away_closing_odds END as closing
+        FROM bets b
+        JOIN pinnacle_markets p ON b.pinnacle_id = p.id
+        WHERE {bet_filter}
+    ) c
+    WHERE bets.id = c.id AND c.closing
+"""
+
+# Archived (already started) matches with closing lines, EV and bet aggregates.
+# Optional filters are bound as NULL rather than spliced in, so every call shares one
+# statement text and therefore one cached prepared statement.
+ARCHIVED_MATCHES_SQL = f"""
+    SELECT 
+        p.id as pinnacle_id,
+        p.event,
+        p.sport,
+        p.home_team,
+        p.away_team,
+        p.home_fair_odds,
+        p.away_fair_odds,
+        p.home_mult_odds,
+        p.away_mult_odds,
+        p.home_closing_odds,
+        p.away_closing_odds,
+        p.start_time,
+        p.closing_captured_at,
+        p.scraped_at,
+        c.match_id as cs500_id,
+        c.home_odds as cs500_home_odds,
+        c.away_odds as cs500_away_odds,
+        m.confidence_score,
+        COUNT(DISTINCT b.id) as bet_count,
+        SUM(CASE WHEN b.status = 'won' THEN 1 ELSE 0 END) as bets_won,
+        SUM(CASE WHEN b.status = 'lost' THEN 1 ELSE 0 END) as bets_lost,
+        SUM(b.stake) as total_staked,
+        ROUND(AVG(b.clv), 2) as avg_clv,
+        -- EV for archived matches if we have CS500 data
+        CASE WHEN c.home_odds AND c.away_odds
+            THEN ROUND({ARCHIVE_HOME_EV_SQL} * 100, 2) END as home_ev_pct,
+        CASE WHEN c.home_odds AND c.away_odds
+            THEN ROUND({ARCHIVE_AWAY_EV_SQL} * 100, 2) END as away_ev_pct,
+        CASE WHEN c.home_odds AND c.away_odds
+            THEN MAX({ARCHIVE_HOME_EV_SQL} * 100, {ARCHIVE_AWAY_EV_SQL} * 100) END as best_ev_pct,
+        -- CLV difference (closing vs opening)
+        CASE WHEN p.home_closing_odds AND p.home_fair_odds
+            THEN ROUND(((p.home_closing_odds - p.home_fair_odds) / p.home_fair_odds) * 100, 2) END as home_clv_move,
+        CASE WHEN p.away_closing_odds AND p.away_fair_odds
+            THEN ROUND(((p.away_closing_odds - p.away_fair_odds) / p.away_fair_odds) * 100, 2) END as away_clv_move
+    FROM pinnacle_markets p
+    LEFT JOIN match_mappings m ON p.id = m.pinnacle_id
+    LEFT JOIN cs500_markets c ON m.cs500_match_id = c.match_id
+    LEFT JOIN bets b ON p.id = b.pinnacle_id
+    WHERE p.start_time IS NOT NULL
+    AND p.start_time <= :bound
+    AND datetime(p.start_time) <= datetime('now')
+    AND (:sport IS NULL OR p.sport = :sport)
+    -- Keyset cursor: (start_time, id) < (:before, :before_id), or start_time alone without an id
+    AND (:before IS NULL OR p.start_time < :before
+         OR (p.start_time = :before AND p.id < :before_id))
+    GROUP BY p.id
+    ORDER BY p.start_time DESC, p.id DESC
+    LIMIT :limit
+"""
+
+# Idle connections kept for reuse; connections beyond this are closed when released
+POOL_SIZE = 8
+# Prepared statements cached per connection (the sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Refresh planner statistics for a markets table after this many scrape stores
+ANALYZE_EVERY_STORES = 12
+
+# Seconds a stats aggregate is served from cache when no write has happened since
+STATS_CACHE_TTL = 5.0
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Build result dicts from an executed cursor's remaining rows.
+    
+    Rows are fetched as plain tuples (the cursor's row_factory is cleared) and zipped with
+    the column names read once from cursor.description, which is much cheaper than
+    dict(sqlite3.Row) for wide rows.
+    """
+    cursor.row_factory = None
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+# Widest UTC offset a stored ISO start_time may carry
+MAX_UTC_OFFSET = timedelta(hours=14)
+
+
+def _start_time_bound(ahead: timedelta = timedelta(0)) -> str:
+    """Upper bound for an index-friendly `start_time <= ?` prefilter.
+    
+    Raw ISO start times sort like the instants they encode, give or take their UTC offset,
+    so comparing against now (+ ahead) plus the widest offset never drops a started match.
+    The exact datetime(start_time) check still runs on the rows the range scan returns.
+    """
+    return (datetime.utcnow() + ahead + MAX_UTC_OFFSET).strftime("%Y-%m-%dT%H:%M:%SZ")
+
 
 class Database:
     """Database manager for esports betting data."""
     
+    # Database files whose schema was already set up in this process
+    _initialized_paths: set = set()
+    
     def __init__(self, db_path: str = None):
         # Use environment variable for Railway, default for local
         import os
         if db_path is None:
             db_path = os.getenv("DATABASE_PATH", "esports_betting.db")
         self.db_path = db_path
-        self.init_database()
+        # What sqlite3.connect() opens; differs from db_path only for in-memory databases
+        self._connect_target = db_path
+        self._connect_uri = False
+        # Keeps a shared in-memory database alive while the pool has no connections open
+        self._memory_anchor: Optional[sqlite3.Connection] = None
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=POOL_SIZE)
+        # Scripts that never call close_pool still get their connections closed cleanly
+        atexit.register(self.close_pool)
+        # Bumped after every committed write, invalidating cached stats. Writes commit from many
+        # to_thread workers, so the increment is locked to never lose a bump.
+        self._write_generation = 0
+        self._write_generation_lock = threading.Lock()
+        self._stats_cache: Dict[str, tuple] = {}
+        self._stores_since_analyze: Dict[str, int] = {}
+        # json_object(...) expression for a bets row, built from the live schema
+        self._bet_json_object_sql: Optional[str] = None
+        # WAL and the schema persist in the file, so only the first instance per path sets them up.
+        # A plain :memory: database is private to one connection, so every pooled connection
+        # would see its own empty database; name it and share its cache across the pool instead.
+        # It has no journal to switch, and lives as long as the anchor connection.
+        if db_path == ":memory:":
+            self._connect_target = f"file:esports-{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._connect_uri = True
+            self._memory_anchor = self._connect()
+            self.init_database()
+        elif db_path not in Database._initialized_paths:
+            self._enable_wal()
+            self.init_database()
+            Database._initialized_paths.add(db_path)
     
-    @contextmanager
-    def get_connection(self):
-        """Context manager for database connections."""
+    def _enable_wal(self):
+        """Switch the database to WAL so API reads don't block on scrape writes."""
         conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        finally:
+            conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a tuned connection that can be handed between threads via the pool."""
+        # Long-lived pooled connections keep every distinct statement prepared
+        conn = sqlite3.connect(self._connect_target, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE, uri=self._connect_uri)
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def get_connection(self):
+        """Context manager for database connections.
+        
+        Connections are borrowed from a small LIFO pool (most recently used first,
+        so its page cache is warm) and returned after commit/rollback.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        changes = conn.total_changes
         try:
             yield conn
             conn.commit()
+            if conn.total_changes != changes:
+                with self._write_generation_lock:
+                    self._write_generation += 1
         except Exception as e:
             conn.rollback()
             raise e
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                self._discard(conn)
+    
+    @contextmanager
+    def get_read_connection(self):
+        """Context manager for read-only work.
+        
+        Borrows from the same pool as get_connection() but skips the commit on exit:
+        plain SELECTs never open a transaction, so there is nothing to commit and the
+        write generation used by the stats caches is left alone.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                self._discard(conn)
+    
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection, letting SQLite refresh any stale statistics first."""
+        try:
+            conn.execute("PRAGMA optimize")
         finally:
             conn.close()
     
+    def close_pool(self):
+        """Close all idle pooled connections (e.g. on app shutdown)."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+    
+    def _analyze_periodically(self, cursor: sqlite3.Cursor, table: str):
+        """Run ANALYZE on a markets table every ANALYZE_EVERY_STORES scrape stores."""
+        count = self._stores_since_analyze.get(table, 0) + 1
+        if count >= ANALYZE_EVERY_STORES:
+            cursor.execute(f"ANALYZE {table}")
+            count = 0
+        self._stores_since_analyze[table] = count
+    
+    def _cached_stats(self, name: str, compute) -> Dict[str, Any]:
+        """Serve a stats aggregate from cache until a write lands or the TTL expires."""
+        now = time.monotonic()
+        entry = self._stats_cache.get(name)
+        if entry and entry[0] == self._write_generation and now - entry[1] < STATS_CACHE_TTL:
+            return entry[2]
+        generation = self._write_generation
+        value = compute()
+        self._stats_cache[name] = (generation, now, value)
+        return value
+    
+    def _ensure_columns(self, cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]):
+        """Add any of the given columns (name -> type) missing from an existing table."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    
     def init_database(self):
         """Initialize database tables."""
         with self.get_connection() as conn:
@@ -55,52 +429,31 @@ class Database:
                     away_closing_odds REAL,
                     closing_captured_at TIMESTAMP,
                     start_time TEXT,
+                    home_team_canon TEXT,
+                    away_team_canon TEXT,
                     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     is_active INTEGER DEFAULT 1
                 )
             """)
             
-            # Add mult odds columns if they don't exist (for existing databases)
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN home_mult_odds REAL")
-            except:
-                pass  # Column already exists
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN away_mult_odds REAL")
-            except:
-                pass  # Column already exists
-            
-            # Add closing line columns if they don't exist
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN home_closing_odds REAL")
-            except:
-                pass
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN away_closing_odds REAL")
-            except:
-                pass
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN closing_captured_at TIMESTAMP")
-            except:
-                pass
-            
-            # Add probability columns if they don't exist (for existing databases)
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN home_fair_prob REAL")
-            except:
-                pass  # Column already exists
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN away_fair_prob REAL")
-            except:
-                pass  # Column already exists
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN home_mult_prob REAL")
-            except:
-                pass  # Column already exists
-            try:
-                cursor.execute("ALTER TABLE pinnacle_markets ADD COLUMN away_mult_prob REAL")
-            except:
-                pass  # Column already exists
+            # Add columns introduced after the first release (for existing databases)
+            self._ensure_columns(cursor, "pinnacle_markets", {
+                # Multiplicative-method odds
+                "home_mult_odds": "REAL",
+                "away_mult_odds": "REAL",
+                # Closing line
+                "home_closing_odds": "REAL",
+                "away_closing_odds": "REAL",
+                "closing_captured_at": "TIMESTAMP",
+                # Fair probabilities
+                "home_fair_prob": "REAL",
+                "away_fair_prob": "REAL",
+                "home_mult_prob": "REAL",
+                "away_mult_prob": "REAL",
+                # Canonical team names for exact-alias matching
+                "home_team_canon": "TEXT",
+                "away_team_canon": "TEXT",
+            })
             
             # CS500 markets table (soft book odds)
             cursor.execute("""
@@ -114,11 +467,19 @@ class Database:
                     away_odds REAL NOT NULL,
                     start_time TEXT,
                     status TEXT,
+                    home_team_canon TEXT,
+                    away_team_canon TEXT,
                     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     is_active INTEGER DEFAULT 1
                 )
             """)
             
+            # Canonical team names for exact-alias matching
+            self._ensure_columns(cursor, "cs500_markets", {
+                "home_team_canon": "TEXT",
+                "away_team_canon": "TEXT",
+            })
+            
             # Match mappings between Pinnacle and CS500
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS match_mappings (
@@ -173,44 +534,75 @@ class Database:
             """)
             
             # Add CLV columns to bets table if they don't exist
-            try:
-                cursor.execute("ALTER TABLE bets ADD COLUMN closing_odds REAL")
-            except:
-                pass
-            try:
-                cursor.execute("ALTER TABLE bets ADD COLUMN clv REAL")
-            except:
-                pass
-            try:
-                cursor.execute("ALTER TABLE bets ADD COLUMN clv_percentage REAL")
-            except:
-                pass
+            self._ensure_columns(cursor, "bets", {
+                "closing_odds": "REAL",
+                "clv": "REAL",
+                "clv_percentage": "REAL",
+            })
             
             # Create indexes for performance
+            # Active-market scans are ordered by start_time, and the mappings join only
+            # needs columns held in idx_mappings_cover, so these replace the older
+            # single-column and (is_active, start_time) indexes
+            for old_index in ("idx_pinnacle_active", "idx_cs500_active", "idx_mappings_pinnacle",
+                              "idx_pinnacle_active_start", "idx_cs500_active_start", "idx_pinnacle_start_time"):
+                cursor.execute(f"DROP INDEX IF EXISTS {old_index}")
+            # Partial indexes only hold active rows, so archived markets don't bloat them
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pinnacle_live_start 
+                ON pinnacle_markets(start_time) WHERE is_active = 1
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cs500_live_start 
+                ON cs500_markets(start_time) WHERE is_active = 1
+            """)
+            # Markets still waiting for capture_closing_lines
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_pinnacle_active 
-                ON pinnacle_markets(is_active)
+                CREATE INDEX IF NOT EXISTS idx_pinnacle_closing 
+                ON pinnacle_markets(start_time) WHERE is_active = 1 AND home_closing_odds IS NULL
             """)
+            # Exact canonical-pair lookups for map_exact_canonical_matches
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_cs500_active 
-                ON cs500_markets(is_active)
+                CREATE INDEX IF NOT EXISTS idx_cs500_canon 
+                ON cs500_markets(home_team_canon, away_team_canon) WHERE is_active = 1
             """)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_mappings_pinnacle 
-                ON match_mappings(pinnacle_id)
+                CREATE INDEX IF NOT EXISTS idx_mappings_cover 
+                ON match_mappings(pinnacle_id, cs500_match_id, confidence_score)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_mappings_cs500 
+                ON match_mappings(cs500_match_id)
             """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_bets_pinnacle 
                 ON bets(pinnacle_id)
             """)
+            # Bets still waiting for update_all_pending_clv
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bets_pending_clv 
+                ON bets(pinnacle_id, bet_side) WHERE closing_odds IS NULL
+            """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_bets_placed_at 
                 ON bets(placed_at)
             """)
+            # Archive range scans on start_time, with sport available for filtering/grouping
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_pinnacle_start_time
-                ON pinnacle_markets(start_time)
+                CREATE INDEX IF NOT EXISTS idx_pinnacle_start
+                ON pinnacle_markets(start_time, sport)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pinnacle_sport
+                ON pinnacle_markets(sport)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bets_status 
+                ON bets(status)
+            """)
+            
+            # Refresh planner statistics so the new indexes get picked
+            cursor.execute("ANALYZE")
             
             conn.commit()
     
@@ -218,18 +610,18 @@ class Database:
         """Store CS500 match IDs."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            for match_id in match_ids:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO cs500_match_ids (match_id)
-                    VALUES (?)
-                """, (match_id,))
+            # Drop duplicates up front (keeping first-seen order) rather than have SQLite ignore them
+            cursor.executemany("""
+                INSERT OR IGNORE INTO cs500_match_ids (match_id)
+                VALUES (?)
+            """, ((match_id,) for match_id in dict.fromkeys(match_ids)))
     
     def get_cs500_match_ids(self) -> List[str]:
         """Get all stored CS500 match IDs."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT match_id FROM cs500_match_ids ORDER BY added_at DESC")
-            return [row[0] for row in cursor.fetchall()]
+            return [row[0] for row in cursor]
     
     def clear_cs500_match_ids(self):
         """Clear all CS500 match IDs."""
@@ -239,121 +631,157 @@ class Database:
     
     def store_pinnacle_markets(self, markets: List[Dict[str, Any]]):
         """Store Pinnacle markets with fair odds."""
+        rows = [
+            (
+                market['id'],
+                market['event'],
+                # Infer sport from event name
+                infer_sport(market.get('event', '')),
+                market['home_team'],
+                market['away_team'],
+                market['home_fair_odds'],
+                market['away_fair_odds'],
+                market.get('home_mult_odds'),
+                market.get('away_mult_odds'),
+                market.get('home_fair_prob'),
+                market.get('away_fair_prob'),
+                market.get('home_mult_prob'),
+                market.get('away_mult_prob'),
+                market.get('start_time'),
+                canonical_team(market['home_team']),
+                canonical_team(market['away_team'])
+            )
+            for market in markets
+        ]
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Take the write lock up front rather than upgrading mid-transaction
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(UPSERT_PINNACLE_MARKET_SQL, rows)
             
-            # Mark all existing as inactive first
-            cursor.execute("UPDATE pinnacle_markets SET is_active = 0")
-            
-            for market in markets:
-                # Infer sport from event name
-                sport = self._infer_sport(market.get('event', ''))
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO pinnacle_markets 
-                    (id, event, sport, home_team, away_team, home_fair_odds, away_fair_odds, home_mult_odds, away_mult_odds, 
-                     home_fair_prob, away_fair_prob, home_mult_prob, away_mult_prob, start_time, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-                """, (
-                    market['id'],
-                    market['event'],
-                    sport,
-                    market['home_team'],
-                    market['away_team'],
-                    market['home_fair_odds'],
-                    market['away_fair_odds'],
-                    market.get('home_mult_odds'),
-                    market.get('away_mult_odds'),
-                    market.get('home_fair_prob'),
-                    market.get('away_fair_prob'),
-                    market.get('home_mult_prob'),
-                    market.get('away_mult_prob'),
-                    market.get('start_time')
-                ))
+            # Deactivate only the markets missing from this scrape
+            cursor.execute("""
+                UPDATE pinnacle_markets SET is_active = 0
+                WHERE is_active = 1 AND id NOT IN (SELECT value FROM json_each(?))
+            """, (json.dumps([row[0] for row in rows]),))
+            self._analyze_periodically(cursor, "pinnacle_markets")
     
     def store_cs500_markets(self, markets: List[Dict[str, Any]]):
         """Store CS500 markets."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Mark all existing as inactive first
-            cursor.execute("UPDATE cs500_markets SET is_active = 0")
-            
-            for market in markets:
-                # Extract moneyline odds
-                moneyline = None
-                for m in market.get('markets', []):
-                    if m.get('name') == 'moneyline':
-                        moneyline = m
-                        break
-                
+        rows = []
+        for market in markets:
+            # Scrapers may hand over moneyline odds at the top level; otherwise find the market
+            if 'home_odds' in market and 'away_odds' in market:
+                home_odds, away_odds = market['home_odds'], market['away_odds']
+            else:
+                moneyline = next((m for m in market.get('markets', ()) if m.get('name') == 'moneyline'), None)
                 if not moneyline:
                     continue
-                
+                home_odds, away_odds = moneyline['home odds'], moneyline['away odds']
+            
+            rows.append((
+                market['match_id'],
+                market['event_name'],
                 # Infer sport from event name
-                sport = self._infer_sport(market.get('event_name', ''))
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO cs500_markets 
-                    (match_id, event_name, sport, home_team, away_team, home_odds, away_odds, start_time, status, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-                """, (
-                    market['match_id'],
-                    market['event_name'],
-                    sport,
-                    market['home_team'],
-                    market['away_team'],
-                    moneyline['home odds'],
-                    moneyline['away odds'],
-                    market.get('start_time'),
-                    market.get('status')
-                ))
+                infer_sport(market.get('event_name', '')),
+                market['home_team'],
+                market['away_team'],
+                home_odds,
+                away_odds,
+                market.get('start_time'),
+                market.get('status'),
+                canonical_team(market['home_team']),
+                canonical_team(market['away_team'])
+            ))
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock up front rather than upgrading mid-transaction
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(UPSERT_CS500_MARKET_SQL, rows)
+            
+            # Deactivate only the markets missing from this scrape
+            cursor.execute("""
+                UPDATE cs500_markets SET is_active = 0
+                WHERE is_active = 1 AND match_id NOT IN (SELECT value FROM json_each(?))
+            """, (json.dumps([row[0] for row in rows]),))
+            self._analyze_periodically(cursor, "cs500_markets")
     
-    def _infer_sport(self, event_name: str) -> Optional[str]:
-        """Infer sport from event name."""
-        if not event_name:
-            return None
-        s = event_name.lower()
-        if "league of legends" in s or "lol" in s:
-            return "lol"
-        if "cs2" in s or "counter-strike" in s or "counter strike" in s:
-            return "cs2"
-        return None
+    def map_exact_canonical_matches(self) -> int:
+        """Map unmapped markets whose teams canonicalize to the same pair, with confidence 1.0.
+        
+        Runs as one INSERT ... SELECT over the canonical-name columns, so the common
+        exact-alias case never reaches the AI matcher. Returns the number of mappings stored.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(INSERT_EXACT_CANONICAL_MAPPINGS_SQL)
+            return cursor.rowcount
     
     def store_match_mapping(self, pinnacle_id: str, cs500_match_id: str, confidence_score: float):
         """Store a match mapping between Pinnacle and CS500."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO match_mappings (pinnacle_id, cs500_match_id, confidence_score)
-                VALUES (?, ?, ?)
-            """, (pinnacle_id, cs500_match_id, confidence_score))
+            cursor.execute(INSERT_MATCH_MAPPING_SQL, (pinnacle_id, cs500_match_id, confidence_score))
+    
+    def store_match_mappings_bulk(self, mappings: List[tuple]):
+        """Store many (pinnacle_id, cs500_match_id, confidence_score) mappings in one transaction."""
+        if not mappings:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock up front rather than upgrading mid-transaction
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(INSERT_MATCH_MAPPING_SQL, mappings)
     
     def get_active_pinnacle_markets(self) -> List[Dict[str, Any]]:
         """Get all active Pinnacle markets."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM pinnacle_markets WHERE is_active = 1
                 ORDER BY start_time
             """)
-            return [dict(row) for row in cursor.fetchall()]
+            return _rows_to_dicts(cursor)
     
     def get_active_cs500_markets(self) -> List[Dict[str, Any]]:
         """Get all active CS500 markets."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM cs500_markets WHERE is_active = 1
                 ORDER BY start_time
             """)
-            return [dict(row) for row in cursor.fetchall()]
+            return _rows_to_dicts(cursor)
     
-    def get_matched_markets(self) -> List[Dict[str, Any]]:
-        """Get markets with matches between Pinnacle and CS500, calculating EV."""
-        with self.get_connection() as conn:
+    def get_matched_markets(self, sport: Optional[str] = None, min_ev: Optional[float] = None,
+                            order_by_ev: bool = False) -> List[Dict[str, Any]]:
+        """Get markets with matches between Pinnacle and CS500, calculating EV.
+        
+        Args:
+            sport: Optional sport filter ('cs2' or 'lol')
+            min_ev: Optional minimum EV percentage that either side must reach
+            order_by_ev: Sort by best EV descending instead of start time
+        """
+        conditions = []
+        params = {"sport": sport, "min_ev": min_ev}
+        if sport:
+            conditions.append("p.sport = :sport")
+        if min_ev is not None:
+            conditions.append("(home_ev_pct >= :min_ev OR away_ev_pct >= :min_ev)")
+        return self._query_matched_markets(conditions, params, order_by_ev)
+    
+    def _query_matched_markets(self, conditions: List[str], params: Dict[str, Any], order_by_ev: bool) -> List[Dict[str, Any]]:
+        """Run the matched-markets join with extra WHERE conditions; EV fields are computed in SQL.
+        
+        Conditions may refer to the computed EV columns by alias and use named parameters.
+        """
+        where = "".join(f" AND {condition}" for condition in conditions)
+        order_by = "best_ev_pct DESC, p.start_time" if order_by_ev else "p.start_time"
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT 
                     p.id as pinnacle_id,
                     p.event,
@@ -370,118 +798,113 @@ class Database:
                     c.away_team as cs500_away,
                     c.home_odds as cs500_home_odds,
                     c.away_odds as cs500_away_odds,
-                    m.confidence_score
+                    m.confidence_score,
+                    ROUND({HOME_EV_SQL}, 4) as home_ev,
+                    ROUND({AWAY_EV_SQL}, 4) as away_ev,
+                    {HOME_EV_PCT_SQL} as home_ev_pct,
+                    {AWAY_EV_PCT_SQL} as away_ev_pct,
+                    ROUND({HOME_MULT_EV_SQL}, 4) as home_mult_ev,
+                    ROUND({AWAY_MULT_EV_SQL}, 4) as away_mult_ev,
+                    ROUND({HOME_MULT_EV_SQL} * 100, 2) as home_mult_ev_pct,
+                    ROUND({AWAY_MULT_EV_SQL} * 100, 2) as away_mult_ev_pct,
+                    -- Best bet uses the power method by default
+                    CASE
+                        WHEN {HOME_EV_SQL} * 100 > 0 OR {AWAY_EV_SQL} * 100 > 0 THEN
+                            CASE WHEN {HOME_EV_SQL} * 100 > {AWAY_EV_SQL} * 100 THEN 'home' ELSE 'away' END
+                    END as best_bet,
+                    {BEST_EV_SQL} * 100 as best_ev_pct
                 FROM match_mappings m
                 JOIN pinnacle_markets p ON m.pinnacle_id = p.id
                 JOIN cs500_markets c ON m.cs500_match_id = c.match_id
-                WHERE p.is_active = 1 AND c.is_active = 1
-                ORDER BY p.start_time
-            """)
-            
-            results = []
-            for row in cursor.fetchall():
-                data = dict(row)
-                
-                # Calculate EV using Power method (default)
-                home_fair_prob = 1 / data['home_fair']
-                away_fair_prob = 1 / data['away_fair']
-                
-                home_ev = (home_fair_prob * data['cs500_home_odds']) - 1
-                away_ev = (away_fair_prob * data['cs500_away_odds']) - 1
-                
-                home_ev_pct = home_ev * 100
-                away_ev_pct = away_ev * 100
-                
-                data['home_ev'] = round(home_ev, 4)
-                data['away_ev'] = round(away_ev, 4)
-                data['home_ev_pct'] = round(home_ev_pct, 2)
-                data['away_ev_pct'] = round(away_ev_pct, 2)
-                
-                # Calculate EV using Multiplicative method
-                if data.get('home_mult') and data.get('away_mult'):
-                    home_mult_prob = 1 / data['home_mult']
-                    away_mult_prob = 1 / data['away_mult']
-                    
-                    home_mult_ev = (home_mult_prob * data['cs500_home_odds']) - 1
-                    away_mult_ev = (away_mult_prob * data['cs500_away_odds']) - 1
-                    
-                    home_mult_ev_pct = home_mult_ev * 100
-                    away_mult_ev_pct = away_mult_ev * 100
-                    
-                    data['home_mult_ev'] = round(home_mult_ev, 4)
-                    data['away_mult_ev'] = round(away_mult_ev, 4)
-                    data['home_mult_ev_pct'] = round(home_mult_ev_pct, 2)
-                    data['away_mult_ev_pct'] = round(away_mult_ev_pct, 2)
-                else:
-                    # Fallback if mult odds not available
-                    data['home_mult_ev'] = data['home_ev']
-                    data['away_mult_ev'] = data['away_ev']
-                    data['home_mult_ev_pct'] = data['home_ev_pct']
-                    data['away_mult_ev_pct'] = data['away_ev_pct']
-                
-                # Determine best bet (using power method by default)
-                if home_ev_pct > 0 or away_ev_pct > 0:
-                    if home_ev_pct > away_ev_pct:
-                        data['best_bet'] = 'home'
-                        data['best_ev_pct'] = home_ev_pct
-                    else:
-                        data['best_bet'] = 'away'
-                        data['best_ev_pct'] = away_ev_pct
-                else:
-                    data['best_bet'] = None
-                    data['best_ev_pct'] = max(home_ev_pct, away_ev_pct)
-                
-                results.append(data)
+                WHERE p.is_active = 1 AND c.is_active = 1{where}
+                ORDER BY {order_by}
+            """, params)
             
-            return results
+            return _rows_to_dicts(cursor)
     
-    def get_positive_ev_markets(self, min_ev: float = 0.0) -> List[Dict[str, Any]]:
-        """Get only markets with positive EV."""
-        all_markets = self.get_matched_markets()
-        return [m for m in all_markets if m['home_ev_pct'] > min_ev or m['away_ev_pct'] > min_ev]
+    def get_positive_ev_markets(self, min_ev: float = 0.0, sport: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get only markets with positive EV, best EV first."""
+        conditions = ["(home_ev_pct > :min_ev OR away_ev_pct > :min_ev)"]
+        params = {"sport": sport, "min_ev": min_ev}
+        if sport:
+            conditions.append("p.sport = :sport")
+        return self._query_matched_markets(conditions, params, order_by_ev=True)
+    
+    def get_stats_counts(self) -> Dict[str, Any]:
+        """Get market, matching and EV counts for the dashboard in a single query."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT
+                    (SELECT COUNT(*) FROM pinnacle_markets WHERE is_active = 1) as pinnacle_count,
+                    (SELECT COUNT(*) FROM cs500_markets WHERE is_active = 1) as cs500_count,
+                    matched.matched_count,
+                    matched.positive_ev_count,
+                    matched.cs2_count,
+                    matched.lol_count,
+                    (SELECT COUNT(*) FROM pinnacle_markets p
+                     WHERE p.is_active = 1
+                     AND NOT EXISTS (SELECT 1 FROM match_mappings m WHERE m.pinnacle_id = p.id)) as unmatched_pinnacle_count,
+                    (SELECT COUNT(*) FROM cs500_markets c
+                     WHERE c.is_active = 1
+                     AND NOT EXISTS (SELECT 1 FROM match_mappings m WHERE m.cs500_match_id = c.match_id)) as unmatched_cs500_count
+                FROM (
+                    SELECT
+                        COUNT(*) as matched_count,
+                        COALESCE(SUM({HOME_EV_PCT_SQL} > 0 OR {AWAY_EV_PCT_SQL} > 0), 0) as positive_ev_count,
+                        COALESCE(SUM(p.sport = 'cs2'), 0) as cs2_count,
+                        COALESCE(SUM(p.sport = 'lol'), 0) as lol_count
+                    FROM match_mappings m
+                    JOIN pinnacle_markets p ON m.pinnacle_id = p.id
+                    JOIN cs500_markets c ON m.cs500_match_id = c.match_id
+                    WHERE p.is_active = 1 AND c.is_active = 1
+                ) matched
+            """)
+            return dict(cursor.fetchone())
     
     def get_mapped_pinnacle_ids(self) -> set:
         """Get set of all Pinnacle IDs that already have mappings."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT DISTINCT pinnacle_id FROM match_mappings")
-            return {row[0] for row in cursor.fetchall()}
+            return {row[0] for row in cursor}
+    
+    def get_unmapped_pinnacle_markets(self) -> List[Dict[str, Any]]:
+        """Get active Pinnacle markets that don't have a mapping yet."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(UNMATCHED_PINNACLE_SQL)
+            return _rows_to_dicts(cursor)
     
     def has_mapping(self, pinnacle_id: str) -> bool:
         """Check if a Pinnacle market already has a mapping."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
+            # Stop at the first mapping instead of counting them all
             cursor.execute(
-                "SELECT COUNT(*) FROM match_mappings WHERE pinnacle_id = ?",
+                "SELECT 1 FROM match_mappings WHERE pinnacle_id = ? LIMIT 1",
                 (pinnacle_id,)
             )
-            count = cursor.fetchone()[0]
-            return count > 0
+            return cursor.fetchone() is not None
     
     def get_unmatched_markets(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get markets that haven't been matched yet."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             
             # Get unmatched Pinnacle markets
-            cursor.execute("""
-                SELECT p.* 
-                FROM pinnacle_markets p
-                LEFT JOIN match_mappings m ON p.id = m.pinnacle_id
-                WHERE p.is_active = 1 AND m.pinnacle_id IS NULL
-                ORDER BY p.start_time
-            """)
-            unmatched_pinnacle = [dict(row) for row in cursor.fetchall()]
+            cursor.execute(UNMATCHED_PINNACLE_SQL)
+            unmatched_pinnacle = _rows_to_dicts(cursor)
             
             # Get unmatched CS500 markets
             cursor.execute("""
                 SELECT c.* 
                 FROM cs500_markets c
-                LEFT JOIN match_mappings m ON c.match_id = m.cs500_match_id
-                WHERE c.is_active = 1 AND m.cs500_match_id IS NULL
+                WHERE c.is_active = 1
+                AND NOT EXISTS (SELECT 1 FROM match_mappings m WHERE m.cs500_match_id = c.match_id)
                 ORDER BY c.start_time
             """)
-            unmatched_cs500 = [dict(row) for row in cursor.fetchall()]
+            unmatched_cs500 = _rows_to_dicts(cursor)
             
             return {
                 "pinnacle": unmatched_pinnacle,
@@ -494,6 +917,9 @@ class Database:
         """Clear all data from the database."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # One write transaction for the whole wipe; unfiltered DELETEs use SQLite's
+            # truncate optimisation
+            cursor.execute("BEGIN IMMEDIATE")
             cursor.execute("DELETE FROM match_mappings")
             cursor.execute("DELETE FROM pinnacle_markets")
             cursor.execute("DELETE FROM cs500_markets")
@@ -513,22 +939,15 @@ class Database:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Count matches to be deleted
-            cursor.execute("""
-                SELECT COUNT(*) FROM pinnacle_markets
-                WHERE start_time IS NOT NULL
-                AND datetime(start_time) <= datetime('now')
-            """)
-            count = cursor.fetchone()[0]
-            
             # Delete archived pinnacle markets
             cursor.execute("""
                 DELETE FROM pinnacle_markets
                 WHERE start_time IS NOT NULL
+                AND start_time <= ?
                 AND datetime(start_time) <= datetime('now')
-            """)
+            """, (_start_time_bound(),))
             
-            return count
+            return cursor.rowcount
     
     def delete_started_matches_without_ev(self) -> int:
         """Delete matches that have started but don't have EV data (no CS500 match).
@@ -545,64 +964,129 @@ class Database:
             # Find and delete Pinnacle markets that have started but have no CS500 match
             cursor.execute("""
                 DELETE FROM pinnacle_markets
-                WHERE id IN (
-                    SELECT p.id
-                    FROM pinnacle_markets p
-                    LEFT JOIN match_mappings m ON p.id = m.pinnacle_id
-                    WHERE p.start_time IS NOT NULL
-                    AND datetime(p.start_time) <= datetime('now')
-                    AND m.pinnacle_id IS NULL
-                )
-            """)
+                WHERE start_time IS NOT NULL
+                AND start_time <= ?
+                AND datetime(start_time) <= datetime('now')
+                AND NOT EXISTS (SELECT 1 FROM match_mappings m WHERE m.pinnacle_id = pinnacle_markets.id)
+            """, (_start_time_bound(),))
             
             deleted_count = cursor.rowcount
             return deleted_count
     
+    def _bet_params(self, bet_data: Dict[str, Any]) -> tuple:
+        """Parameters for INSERT_BET_SQL from a bet request."""
+        return (
+            bet_data['pinnacle_id'],
+            bet_data['event'],
+            bet_data.get('sport'),
+            bet_data['home_team'],
+            bet_data['away_team'],
+            bet_data['bet_side'],
+            bet_data['bet_team'],
+            bet_data['odds'],
+            bet_data['stake'],
+            bet_data['expected_value'],
+            bet_data['ev_percentage'],
+            bet_data['fair_odds'],
+            bet_data['potential_return'],
+            bet_data['potential_profit'],
+            bet_data.get('start_time'),
+            bet_data.get('notes')
+        )
+    
     def place_bet(self, bet_data: Dict[str, Any]) -> int:
         """Place a bet and store it in the database."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO bets (
-                    pinnacle_id, event, sport, home_team, away_team,
-                    bet_side, bet_team, odds, stake, expected_value,
-                    ev_percentage, fair_odds, potential_return, potential_profit,
-                    start_time, notes
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                bet_data['pinnacle_id'],
-                bet_data['event'],
-                bet_data.get('sport'),
-                bet_data['home_team'],
-                bet_data['away_team'],
-                bet_data['bet_side'],
-                bet_data['bet_team'],
-                bet_data['odds'],
-                bet_data['stake'],
-                bet_data['expected_value'],
-                bet_data['ev_percentage'],
-                bet_data['fair_odds'],
-                bet_data['potential_return'],
-                bet_data['potential_profit'],
-                bet_data.get('start_time'),
-                bet_data.get('notes')
-            ))
-            return cursor.lastrowid
+            cursor.execute(INSERT_BET_SQL, self._bet_params(bet_data))
+            return cursor.fetchone()[0]
     
-    def get_all_bets(self) -> List[Dict[str, Any]]:
-        """Get all bets from the database."""
+    def place_bets_bulk(self, bets: List[Dict[str, Any]]) -> List[int]:
+        """Place several bets in one transaction, returning their ids in order."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM bets
-                ORDER BY placed_at DESC
-            """)
-            return [dict(row) for row in cursor.fetchall()]
+            # executemany can't return rows, but the statement is prepared once and
+            # all inserts share a single commit
+            bet_ids = []
+            for bet_data in bets:
+                cursor.execute(INSERT_BET_SQL, self._bet_params(bet_data))
+                bet_ids.append(cursor.fetchone()[0])
+            return bet_ids
+    
+    def _bets_page_query(self, select: str, before: Optional[str], before_id: Optional[int],
+                         limit: Optional[int]) -> tuple:
+        """Build the newest-first bets query (and params) for one keyset page."""
+        query = f"SELECT {select} FROM bets"
+        params: List[Any] = []
+        if before is not None:
+            if before_id is not None:
+                query += " WHERE (placed_at, id) < (?, ?)"
+                params.extend([before, before_id])
+            else:
+                query += " WHERE placed_at < ?"
+                params.append(before)
+        query += " ORDER BY placed_at DESC, id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+    
+    def get_all_bets(self, before: Optional[str] = None, before_id: Optional[int] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get bets from the database, newest first.
+        
+        Args:
+            before: Keyset cursor; only return bets placed before this placed_at
+            before_id: Id of the last bet already seen, breaking placed_at ties with before
+            limit: Optional page size (all bets when omitted)
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(*self._bets_page_query("*", before, before_id, limit))
+            return _rows_to_dicts(cursor)
+    
+    def iter_all_bets(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield every bet, newest first, without loading the whole table at once.
+        
+        Rows are fetched batch_size at a time; the pooled connection is held until the
+        generator is exhausted or closed.
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(*self._bets_page_query("*", None, None, None))
+            cursor.row_factory = None
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(zip(columns, row))
+    
+    def _bet_json_object(self, cursor: sqlite3.Cursor) -> str:
+        """SQL expression encoding a bets row (all columns, unqualified) as a JSON object."""
+        if self._bet_json_object_sql is None:
+            cursor.execute("PRAGMA table_info(bets)")
+            fields = ", ".join(f"'{row[1]}', {row[1]}" for row in cursor.fetchall())
+            self._bet_json_object_sql = f"json_object({fields})"
+        return self._bet_json_object_sql
+    
+    def get_all_bets_json(self, before: Optional[str] = None, before_id: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """Same page as get_all_bets, with each bet already encoded as JSON by SQLite.
+        
+        Rows have 'bet' (a JSON object string) plus 'placed_at' and 'id' for the next cursor,
+        so the API can return them without building a dict per bet.
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            select = f"{self._bet_json_object(cursor)} as bet, placed_at, id"
+            cursor.execute(*self._bets_page_query(select, before, before_id, limit))
+            return cursor.fetchall()
     
     def get_bet_by_id(self, bet_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific bet by ID."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM bets WHERE id = ?", (bet_id,))
             row = cursor.fetchone()
@@ -621,51 +1105,42 @@ class Database:
     
     def get_bet_stats(self) -> Dict[str, Any]:
         """Get statistics about all bets."""
-        with self.get_connection() as conn:
+        return self._cached_stats("bets", self._query_bet_stats)
+    
+    def _query_bet_stats(self) -> Dict[str, Any]:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             
-            # Total bets
-            cursor.execute("SELECT COUNT(*) FROM bets")
-            total_bets = cursor.fetchone()[0]
-            
-            # Total staked
-            cursor.execute("SELECT SUM(stake) FROM bets")
-            total_staked = cursor.fetchone()[0] or 0
-            
-            # Total potential return
-            cursor.execute("SELECT SUM(potential_return) FROM bets WHERE status = 'pending'")
-            total_potential = cursor.fetchone()[0] or 0
-            
-            # Settled bets stats
-            cursor.execute("SELECT COUNT(*) FROM bets WHERE status IN ('won', 'lost', 'void')")
-            settled_bets = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT SUM(stake) FROM bets WHERE status = 'won'")
-            won_stake = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT SUM(actual_return) FROM bets WHERE status = 'won'")
-            won_return = cursor.fetchone()[0] or 0
-            
-            # Average EV
-            cursor.execute("SELECT AVG(ev_percentage) FROM bets")
-            avg_ev = cursor.fetchone()[0] or 0
-            
-            # Total EV in dollars
-            cursor.execute("SELECT SUM(expected_value) FROM bets")
-            total_ev = cursor.fetchone()[0] or 0
-            
-            # CLV stats
-            cursor.execute("SELECT AVG(clv) FROM bets WHERE clv IS NOT NULL")
-            avg_clv = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT COUNT(*) FROM bets WHERE clv IS NOT NULL")
-            bets_with_clv = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM bets WHERE clv > 0")
-            positive_clv_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT SUM(stake) FROM bets WHERE clv > 0")
-            positive_clv_stake = cursor.fetchone()[0] or 0
+            # All aggregates in a single pass over the bets table
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as total_bets,
+                    COALESCE(SUM(stake), 0) as total_staked,
+                    COALESCE(SUM(CASE WHEN status = 'pending' THEN potential_return END), 0) as total_potential,
+                    COUNT(CASE WHEN status IN ('won', 'lost', 'void') THEN 1 END) as settled_bets,
+                    COALESCE(SUM(CASE WHEN status = 'won' THEN stake END), 0) as won_stake,
+                    COALESCE(SUM(CASE WHEN status = 'won' THEN actual_return END), 0) as won_return,
+                    COALESCE(AVG(ev_percentage), 0) as avg_ev,
+                    COALESCE(SUM(expected_value), 0) as total_ev,
+                    COALESCE(AVG(clv), 0) as avg_clv,
+                    COUNT(clv) as bets_with_clv,
+                    COUNT(CASE WHEN clv > 0 THEN 1 END) as positive_clv_count,
+                    COALESCE(SUM(CASE WHEN clv > 0 THEN stake END), 0) as positive_clv_stake
+                FROM bets
+            """)
+            row = cursor.fetchone()
+            total_bets = row["total_bets"]
+            total_staked = row["total_staked"]
+            total_potential = row["total_potential"]
+            settled_bets = row["settled_bets"]
+            won_stake = row["won_stake"]
+            won_return = row["won_return"]
+            avg_ev = row["avg_ev"]
+            total_ev = row["total_ev"]
+            avg_clv = row["avg_clv"]
+            bets_with_clv = row["bets_with_clv"]
+            positive_clv_count = row["positive_clv_count"]
+            positive_clv_stake = row["positive_clv_stake"]
             
             return {
                 "total_bets": total_bets,
@@ -694,40 +1169,22 @@ class Database:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Get markets that are starting within the next 5 minutes and don't have closing odds yet
+            # Capture markets starting within the next 5 minutes that don't have closing odds yet,
+            # using multiplicative odds if available, otherwise fair odds
             cursor.execute("""
-                SELECT id, home_fair_odds, away_fair_odds, home_mult_odds, away_mult_odds, start_time
-                FROM pinnacle_markets
+                UPDATE pinnacle_markets
+                SET home_closing_odds = CASE WHEN home_mult_odds THEN home_mult_odds ELSE home_fair_odds END,
+                    away_closing_odds = CASE WHEN away_mult_odds THEN away_mult_odds ELSE away_fair_odds END,
+                    closing_captured_at = CURRENT_TIMESTAMP
                 WHERE is_active = 1
                 AND start_time IS NOT NULL
                 AND home_closing_odds IS NULL
                 AND away_closing_odds IS NULL
+                AND start_time <= ?
                 AND datetime(start_time) <= datetime('now', '+5 minutes')
-            """)
+            """, (_start_time_bound(timedelta(minutes=5)),))
             
-            markets_to_update = cursor.fetchall()
-            count = 0
-            
-            for market in markets_to_update:
-                market_id = market[0]
-                home_fair = market[1]
-                away_fair = market[2]
-                
-                # Use multiplicative odds if available, otherwise fair odds
-                home_closing = market[3] if market[3] else home_fair
-                away_closing = market[4] if market[4] else away_fair
-                
-                cursor.execute("""
-                    UPDATE pinnacle_markets
-                    SET home_closing_odds = ?,
-                        away_closing_odds = ?,
-                        closing_captured_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (home_closing, away_closing, market_id))
-                
-                count += 1
-            
-            return count
+            return cursor.rowcount
     
     def update_bet_clv(self, bet_id: int) -> bool:
         """Calculate and update CLV for a specific bet using the closing line.
@@ -737,49 +1194,23 @@ class Database:
         
         Returns True if CLV was calculated, False if closing line not available yet.
         """
+        return self.update_bets_clv_bulk([bet_id]) == 1
+    
+    def update_bets_clv_bulk(self, bet_ids: List[int]) -> int:
+        """Calculate and update CLV for the given bets in one statement.
+        
+        Bets whose closing line isn't available yet are left untouched.
+        Returns the number of bets updated.
+        """
+        if not bet_ids:
+            return 0
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get bet details
-            cursor.execute("""
-                SELECT b.pinnacle_id, b.bet_side, b.odds,
-                       p.home_closing_odds, p.away_closing_odds
-                FROM bets b
-                JOIN pinnacle_markets p ON b.pinnacle_id = p.id
-                WHERE b.id = ?
-            """, (bet_id,))
-            
-            bet_data = cursor.fetchone()
-            if not bet_data:
-                return False
-            
-            _, bet_side, bet_odds, home_closing, away_closing = bet_data
-            
-            # Check if closing line is available
-            closing_odds = home_closing if bet_side == 'home' else away_closing
-            if not closing_odds:
-                return False
-            
-            # Calculate CLV
-            # Method 1: Odds difference percentage
-            clv_pct = ((bet_odds - closing_odds) / closing_odds) * 100
-            
-            # Method 2: Implied probability difference (this is more accurate for betting)
-            # Positive CLV means you got better odds than closing (better value)
-            bet_prob = 1 / bet_odds
-            closing_prob = 1 / closing_odds
-            clv_prob_diff = (closing_prob - bet_prob) * 100  # In percentage points
-            
-            # Update bet with CLV
-            cursor.execute("""
-                UPDATE bets
-                SET closing_odds = ?,
-                    clv = ?,
-                    clv_percentage = ?
-                WHERE id = ?
-            """, (closing_odds, clv_prob_diff, clv_pct, bet_id))
-            
-            return True
+            cursor.execute(
+                UPDATE_BET_CLV_SQL.format(bet_filter="b.id IN (SELECT value FROM json_each(?))"),
+                (json.dumps(list(bet_ids)),)
+            )
+            return cursor.rowcount
     
     def update_all_pending_clv(self) -> int:
         """Update CLV for all pending bets that don't have CLV calculated yet.
@@ -788,128 +1219,37 @@ class Database:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get all bets without CLV that have closing lines available
-            cursor.execute("""
-                SELECT b.id
-                FROM bets b
-                JOIN pinnacle_markets p ON b.pinnacle_id = p.id
-                WHERE b.closing_odds IS NULL
-                AND ((b.bet_side = 'home' AND p.home_closing_odds IS NOT NULL)
-                     OR (b.bet_side = 'away' AND p.away_closing_odds IS NOT NULL))
-            """)
-            
-            bet_ids = [row[0] for row in cursor.fetchall()]
-        
-        count = 0
-        for bet_id in bet_ids:
-            if self.update_bet_clv(bet_id):
-                count += 1
-        
-        return count
+            # Pending bets only; the partial idx_bets_pending_clv holds exactly these
+            cursor.execute(UPDATE_BET_CLV_SQL.format(
+                bet_filter="b.closing_odds IS NULL AND b.bet_side IN ('home', 'away')"
+            ))
+            return cursor.rowcount
     
-    def get_archived_matches(self, sport: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    def get_archived_matches(self, sport: Optional[str] = None, limit: Optional[int] = None,
+                             before: Optional[str] = None, before_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all matches that have gone live (past their start time) with their closing line data.
         
         Args:
             sport: Optional sport filter ('cs2' or 'lol')
             limit: Optional limit on number of results
+            before: Keyset cursor; only return matches that started before this start_time
+            before_id: Pinnacle id of the last match already seen, breaking start_time ties with before
             
         Returns:
             List of archived matches with their data including closing lines, bets placed, etc.
         """
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             
-            query = """
-                SELECT 
-                    p.id as pinnacle_id,
-                    p.event,
-                    p.sport,
-                    p.home_team,
-                    p.away_team,
-                    p.home_fair_odds,
-                    p.away_fair_odds,
-                    p.home_mult_odds,
-                    p.away_mult_odds,
-                    p.home_closing_odds,
-                    p.away_closing_odds,
-                    p.start_time,
-                    p.closing_captured_at,
-                    p.scraped_at,
-                    c.match_id as cs500_id,
-                    c.home_odds as cs500_home_odds,
-                    c.away_odds as cs500_away_odds,
-                    m.confidence_score,
-                    COUNT(DISTINCT b.id) as bet_count,
-                    SUM(CASE WHEN b.status = 'won' THEN 1 ELSE 0 END) as bets_won,
-                    SUM(CASE WHEN b.status = 'lost' THEN 1 ELSE 0 END) as bets_lost,
-                    SUM(b.stake) as total_staked,
-                    AVG(b.clv) as avg_clv
-                FROM pinnacle_markets p
-                LEFT JOIN match_mappings m ON p.id = m.pinnacle_id
-                LEFT JOIN cs500_markets c ON m.cs500_match_id = c.match_id
-                LEFT JOIN bets b ON p.id = b.pinnacle_id
-                WHERE p.start_time IS NOT NULL
-                AND datetime(p.start_time) <= datetime('now')
-            """
-            
-            params = []
-            if sport:
-                query += " AND p.sport = ?"
-                params.append(sport)
-            
-            query += """
-                GROUP BY p.id
-                ORDER BY p.start_time DESC
-            """
-            
-            if limit:
-                query += " LIMIT ?"
-                params.append(limit)
-            
-            cursor.execute(query, params)
-            results = []
-            
-            for row in cursor.fetchall():
-                data = dict(row)
-                
-                # Calculate EV for archived matches if we have CS500 data
-                if data.get('cs500_home_odds') and data.get('cs500_away_odds'):
-                    home_fair_prob = 1 / data['home_fair_odds'] if data['home_fair_odds'] else 0
-                    away_fair_prob = 1 / data['away_fair_odds'] if data['away_fair_odds'] else 0
-                    
-                    home_ev = (home_fair_prob * data['cs500_home_odds']) - 1
-                    away_ev = (away_fair_prob * data['cs500_away_odds']) - 1
-                    
-                    data['home_ev_pct'] = round(home_ev * 100, 2)
-                    data['away_ev_pct'] = round(away_ev * 100, 2)
-                    data['best_ev_pct'] = max(home_ev * 100, away_ev * 100)
-                else:
-                    data['home_ev_pct'] = None
-                    data['away_ev_pct'] = None
-                    data['best_ev_pct'] = None
-                
-                # Calculate CLV difference (closing vs opening)
-                if data.get('home_closing_odds') and data.get('home_fair_odds'):
-                    home_clv_move = ((data['home_closing_odds'] - data['home_fair_odds']) / data['home_fair_odds']) * 100
-                    data['home_clv_move'] = round(home_clv_move, 2)
-                else:
-                    data['home_clv_move'] = None
-                
-                if data.get('away_closing_odds') and data.get('away_fair_odds'):
-                    away_clv_move = ((data['away_closing_odds'] - data['away_fair_odds']) / data['away_fair_odds']) * 100
-                    data['away_clv_move'] = round(away_clv_move, 2)
-                else:
-                    data['away_clv_move'] = None
-                
-                # Format averages
-                if data['avg_clv'] is not None:
-                    data['avg_clv'] = round(data['avg_clv'], 2)
-                
-                results.append(data)
-            
-            return results
+            cursor.execute(ARCHIVED_MATCHES_SQL, {
+                "bound": _start_time_bound(),
+                "sport": sport or None,
+                "before": before,
+                "before_id": before_id,
+                # LIMIT -1 means no limit
+                "limit": limit or -1,
+            })
+            return _rows_to_dicts(cursor)
     
     def get_archived_match_details(self, pinnacle_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific archived match including all bets placed on it.
@@ -920,41 +1260,40 @@ class Database:
         Returns:
             Dictionary with match details and list of bets placed on it
         """
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             
-            # Get match details
-            cursor.execute("""
+            bet_json = self._bet_json_object(cursor)
+            
+            # Match details plus its bets (oldest first) as a JSON array, in one query
+            cursor.execute(f"""
                 SELECT 
                     p.*,
                     c.match_id as cs500_id,
                     c.home_odds as cs500_home_odds,
                     c.away_odds as cs500_away_odds,
                     c.event_name as cs500_event,
-                    m.confidence_score
+                    m.confidence_score,
+                    (SELECT json_group_array(json(bet)) FROM (
+                        SELECT {bet_json} as bet FROM bets
+                        WHERE pinnacle_id = p.id
+                        ORDER BY placed_at ASC
+                    )) as bets_json
                 FROM pinnacle_markets p
                 LEFT JOIN match_mappings m ON p.id = m.pinnacle_id
                 LEFT JOIN cs500_markets c ON m.cs500_match_id = c.match_id
                 WHERE p.id = ?
                 AND p.start_time IS NOT NULL
+                AND p.start_time <= ?
                 AND datetime(p.start_time) <= datetime('now')
-            """, (pinnacle_id,))
+            """, (pinnacle_id, _start_time_bound()))
             
             row = cursor.fetchone()
             if not row:
                 return None
             
             match_data = dict(row)
-            
-            # Get all bets placed on this match
-            cursor.execute("""
-                SELECT * FROM bets
-                WHERE pinnacle_id = ?
-                ORDER BY placed_at ASC
-            """, (pinnacle_id,))
-            
-            bets = [dict(bet_row) for bet_row in cursor.fetchall()]
-            match_data['bets'] = bets
+            match_data['bets'] = json.loads(match_data.pop('bets_json'))
             
             return match_data
     
@@ -964,46 +1303,30 @@ class Database:
         Returns:
             Dictionary with archive statistics
         """
-        with self.get_connection() as conn:
+        return self._cached_stats("archive", self._query_archive_stats)
+    
+    def _query_archive_stats(self) -> Dict[str, Any]:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             
-            # Total archived matches
-            cursor.execute("""
-                SELECT COUNT(*) FROM pinnacle_markets
-                WHERE start_time IS NOT NULL
-                AND datetime(start_time) <= datetime('now')
-            """)
-            total_archived = cursor.fetchone()[0]
-            
-            # Matches with closing lines captured
+            # One pass over archived markets, counted per sport and totalled here
             cursor.execute("""
-                SELECT COUNT(*) FROM pinnacle_markets
-                WHERE start_time IS NOT NULL
-                AND datetime(start_time) <= datetime('now')
-                AND home_closing_odds IS NOT NULL
-                AND away_closing_odds IS NOT NULL
-            """)
-            with_closing_lines = cursor.fetchone()[0]
-            
-            # Archived matches by sport
-            cursor.execute("""
-                SELECT sport, COUNT(*) as count
-                FROM pinnacle_markets
+                SELECT sport,
+                       COUNT(*),
+                       SUM(home_closing_odds IS NOT NULL AND away_closing_odds IS NOT NULL),
+                       SUM(EXISTS (SELECT 1 FROM bets b WHERE b.pinnacle_id = p.id))
+                FROM pinnacle_markets p
                 WHERE start_time IS NOT NULL
+                AND start_time <= ?
                 AND datetime(start_time) <= datetime('now')
                 GROUP BY sport
-            """)
-            by_sport = {row[0] or 'unknown': row[1] for row in cursor.fetchall()}
+            """, (_start_time_bound(),))
+            rows = cursor.fetchall()
             
-            # Matches with bets
-            cursor.execute("""
-                SELECT COUNT(DISTINCT p.id)
-                FROM pinnacle_markets p
-                JOIN bets b ON p.id = b.pinnacle_id
-                WHERE p.start_time IS NOT NULL
-                AND datetime(p.start_time) <= datetime('now')
-            """)
-            with_bets = cursor.fetchone()[0]
+            by_sport = {row[0] or 'unknown': row[1] for row in rows}
+            total_archived = sum(row[1] for row in rows)
+            with_closing_lines = sum(row[2] for row in rows)
+            with_bets = sum(row[3] for row in rows)
             
             return {
                 "total_archived": total_archived,
@@ -1015,7 +1338,7 @@ class Database:
     
     def get_match_details(self, pinnacle_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific match including all calculations."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT 
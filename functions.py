@@ -1,12 +1,25 @@
-import re
-from typing import Dict, Any, Optional
+import logging
+import string
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+class _NonAlnumToSpace(dict):
+    """str.translate table keeping a-z0-9 and mapping every other code point to a space."""
+    def __missing__(self, code: int) -> str:
+        self[code] = " "
+        return " "
+
+_NORM_TABLE = _NonAlnumToSpace({ord(c): c for c in string.ascii_lowercase + string.digits})
 
 def _norm_team(name: str) -> str:
     if not name:
         return ""
-    s = name.lower()
-    s = re.sub(r'[^a-z0-9]+', ' ', s).strip()
-    return s
+    # Same result as re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+    return " ".join(name.lower().translate(_NORM_TABLE).split())
 
 def _moneyline_from_cs500(item: Dict[str, Any]) -> Optional[Dict[str, float]]:
     if not item or "markets" not in item:
@@ -105,58 +118,180 @@ TEAM_ALIASES: Dict[str, str] = {
     "koi": "koi",
 }
 
+@lru_cache(maxsize=4096)
 def canonical_team(name: str) -> str:
     """Normalize and map a team name to a canonical token using TEAM_ALIASES."""
     norm = _norm_team(name)
     return TEAM_ALIASES.get(norm, norm)
 
-def infer_sport_from_pinnacle_event(event_name: str) -> Optional[str]:
-    """Infer sport code ('lol' or 'cs2') from Pinnacle league/event name."""
+_LOL_KEYWORDS = ("league of legends", "lol")
+_CS2_KEYWORDS = ("cs2", "counter-strike", "counter strike")
+
+@lru_cache(maxsize=1024)
+def infer_sport(event_name: str) -> Optional[str]:
+    """Infer sport code ('lol' or 'cs2') from a Pinnacle league or CS500 event name."""
     if not event_name:
         return None
     s = event_name.lower()
-    if "league of legends" in s or "lol" in s:
+    if any(k in s for k in _LOL_KEYWORDS):
         return "lol"
-    if "cs2" in s or "counter-strike" in s or "counter strike" in s:
+    if any(k in s for k in _CS2_KEYWORDS):
         return "cs2"
     return None
 
-def infer_sport_from_cs500_event(event_name: str) -> Optional[str]:
-    """Infer sport code ('lol' or 'cs2') from CS500 event name."""
-    if not event_name:
+# Both books name events the same way, so one rule (and one cache) serves both
+infer_sport_from_pinnacle_event = infer_sport
+infer_sport_from_cs500_event = infer_sport
+
+# --- Candidate blocking ---
+
+def _start_hour(start_time: Any) -> Optional[int]:
+    """Hour bucket (epoch seconds // 3600) for an ISO string or epoch seconds/millis."""
+    if start_time is None or start_time == "":
         return None
-    s = event_name.lower()
-    if "league of legends" in s or "lol" in s:
-        return "lol"
-    if "cs2" in s or "counter-strike" in s or "counter strike" in s:
-        return "cs2"
-    return None
+    try:
+        if isinstance(start_time, (int, float)) or str(start_time).isdigit():
+            ts = float(start_time)
+            if ts > 1e11:  # epoch milliseconds
+                ts /= 1000
+        else:
+            ts = datetime.fromisoformat(str(start_time).replace('Z', '+00:00')).timestamp()
+        return int(ts // 3600)
+    except (ValueError, OverflowError):
+        return None
+
+def _team_block(name: str) -> str:
+    return canonical_team(name)[:4]
+
+def build_candidate_blocks(cs500_games: List[dict]) -> Dict[tuple, List[dict]]:
+    """Index CS500 games by team-name prefix and start-time hour."""
+    blocks: Dict[tuple, List[dict]] = defaultdict(list)
+    for game in cs500_games:
+        for team in (game.get("home_team", ""), game.get("away_team", "")):
+            key = _team_block(team)
+            if key:
+                blocks[("team", key)].append(game)
+        hour = _start_hour(game.get("start_time"))
+        if hour is not None:
+            blocks[("hour", hour)].append(game)
+    return blocks
+
+def candidate_games(pinnacle_game: dict, blocks: Dict[tuple, List[dict]], cs500_games: List[dict]) -> List[dict]:
+    """Return the CS500 games sharing a team or start-time block with a Pinnacle game.
+    
+    Falls back to all games when nothing shares a block, so unusual names are still scored.
+    """
+    selected = set()
+    for team in (pinnacle_game.get("home_team", ""), pinnacle_game.get("away_team", "")):
+        key = _team_block(team)
+        if key:
+            selected.update(id(g) for g in blocks.get(("team", key), ()))
+    hour = _start_hour(pinnacle_game.get("start_time"))
+    if hour is not None:
+        # Neighbouring buckets so games near an hour boundary still share a block
+        for h in (hour - 1, hour, hour + 1):
+            selected.update(id(g) for g in blocks.get(("hour", h), ()))
+    if not selected:
+        return cs500_games
+    # Keep the original order so ties resolve the same way as a full scan
+    return [g for g in cs500_games if id(g) in selected]
+
+def exact_canonical_match(pinnacle_game: dict, cs500_games: List[dict]) -> Optional[dict]:
+    """Return the CS500 game whose teams canonicalize to the same pair, if any.
+    
+    When several do (e.g. a rematch), the one starting closest to the Pinnacle game wins.
+    """
+    p_home = canonical_team(pinnacle_game.get("home_team", ""))
+    p_away = canonical_team(pinnacle_game.get("away_team", ""))
+    if not p_home or not p_away:
+        return None
+    exact = [
+        g for g in cs500_games
+        if canonical_team(g.get("home_team", "")) == p_home
+        and canonical_team(g.get("away_team", "")) == p_away
+    ]
+    if len(exact) <= 1:
+        return exact[0] if exact else None
+    p_hour = _start_hour(pinnacle_game.get("start_time"))
+    if p_hour is None:
+        return exact[0]
+    def distance(game: dict) -> float:
+        hour = _start_hour(game.get("start_time"))
+        return abs(hour - p_hour) if hour is not None else float("inf")
+    return min(exact, key=distance)
 
 # --- AI-powered matching ---
 try:
     from sentence_transformers import SentenceTransformer
     import numpy as np
-    from datetime import datetime
     
     # Load model (cached after first use)
     _model = None
     def get_model():
         global _model
         if _model is None:
-            _model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+            model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+            model.eval()
+            if model.device.type == 'cpu':
+                # int8 Linear layers: smaller and faster on CPU, near-identical similarities.
+                # Quantized into a copy, so a failure part-way leaves the FP32 model intact.
+                try:
+                    import torch
+                    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                except (ImportError, AttributeError, RuntimeError) as e:
+                    logger.warning(f"⚠️ int8 quantization failed, using the FP32 model: {e}")
+            _model = model
         return _model
     
+    def warm_up_model() -> None:
+        """Initialize a matching worker process: load the model and run one encode.
+        
+        Runs as the match pool's initializer, so the first pass a worker serves doesn't pay
+        for the load. Matching already runs one worker process per CPU, so torch is limited
+        to a single intra-op thread there; the API process itself stays unthrottled.
+        """
+        try:
+            import torch
+            torch.set_num_threads(1)
+        except ImportError:
+            pass
+        get_model().encode(["warmup"])
+    
+    # Unit-length embeddings per team name; the same names recur across every scrape
+    _embedding_cache: Dict[str, Any] = {}
+    _EMBEDDING_CACHE_MAX = 10000
+    
+    def _cache_embeddings(names) -> Dict[str, Any]:
+        """Encode any names not cached yet in a single batched model call."""
+        missing = [n for n in dict.fromkeys(names) if n and n not in _embedding_cache]
+        if not missing:
+            return {}
+        if len(_embedding_cache) + len(missing) > _EMBEDDING_CACHE_MAX:
+            _embedding_cache.clear()
+        vectors = get_model().encode(missing, batch_size=64, convert_to_numpy=True)
+        encoded = {name: vector / np.linalg.norm(vector) for name, vector in zip(missing, vectors)}
+        _embedding_cache.update(encoded)
+        return encoded
+    
+    def _embedding(name: str):
+        vector = _embedding_cache.get(name)
+        if vector is None:
+            vector = _cache_embeddings([name])[name]
+        return vector
+    
     def team_similarity(team1: str, team2: str) -> float:
         """Get semantic similarity between team names using embeddings."""
         if not team1 or not team2:
             return 0.0
         
-        model = get_model()
-        embeddings = model.encode([team1, team2])
-        similarity = np.dot(embeddings[0], embeddings[1]) / (
-            np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-        )
-        return float(similarity)
+        # Cosine similarity of cached unit vectors
+        return float(np.dot(_embedding(team1), _embedding(team2)))
+    
+    def _embedding_matrix(names: List[str]):
+        """Stack cached unit embeddings (zero rows for blank names, which never match)."""
+        _cache_embeddings(names)
+        dim = get_model().get_sentence_embedding_dimension()
+        return np.stack([_embedding(n) if n else np.zeros(dim) for n in names])
     
     def ai_match_score(pinnacle_game: dict, cs500_game: dict) -> float:
         """AI-powered match confidence score."""
@@ -170,6 +305,10 @@ try:
             pinnacle_game.get("away_team", ""), 
             cs500_game.get("away_team", "")
         )
+        return _score_from_similarities(pinnacle_game, cs500_game, home_sim, away_sim)
+    
+    def _score_from_similarities(pinnacle_game: dict, cs500_game: dict, home_sim: float, away_sim: float) -> float:
+        """Combine team similarities with time and sport signals into a confidence score."""
         
         # CRITICAL: Both teams must match reasonably well
         # Use minimum instead of average to ensure both teams match
@@ -212,23 +351,41 @@ try:
     
     def find_best_match(pinnacle_game: dict, cs500_games: list) -> tuple[Optional[dict], float]:
         """Find the best CS500 match for a Pinnacle game using AI."""
+        if not cs500_games:
+            return None, 0.0
         
-        best_match = None
-        best_score = 0.0
+        # Both teams share a canonical alias: no need to run the model
+        exact = exact_canonical_match(pinnacle_game, cs500_games)
+        if exact is not None:
+            return exact, 1.0
         
-        for cs500_game in cs500_games:
-            score = ai_match_score(pinnacle_game, cs500_game)
-            
-            if score > best_score and score > 0.6:  # Threshold for "good enough"
-                best_match = cs500_game
-                best_score = score
+        # Every candidate's team similarities in two matrix-vector products
+        p_home, p_away = _embedding_matrix([
+            pinnacle_game.get("home_team", ""), pinnacle_game.get("away_team", "")
+        ])
+        home_sims = _embedding_matrix([g.get("home_team", "") for g in cs500_games]) @ p_home
+        away_sims = _embedding_matrix([g.get("away_team", "") for g in cs500_games]) @ p_away
+        
+        # Only candidates where both teams clear the similarity floor need the full score
+        scores = np.zeros(len(cs500_games))
+        for i in np.flatnonzero(np.minimum(home_sims, away_sims) >= 0.5):
+            scores[i] = _score_from_similarities(
+                pinnacle_game, cs500_games[i], float(home_sims[i]), float(away_sims[i])
+            )
         
-        return best_match, best_score
+        # argmax picks the first of equal scores, as the sequential scan did
+        best = int(np.argmax(scores))
+        if scores[best] > 0.6:  # Threshold for "good enough"
+            return cs500_games[best], float(scores[best])
+        return None, 0.0
 
 except ImportError:
     # Fallback if sentence-transformers not installed
     from difflib import SequenceMatcher
     
+    def warm_up_model() -> None:
+        """Fallback: nothing to load."""
+    
     def team_similarity(team1: str, team2: str) -> float:
         """Fallback: simple string similarity."""
         return SequenceMatcher(None, team1.lower(), team2.lower()).ratio()
@@ -258,6 +415,10 @@ except ImportError:
     
     def find_best_match(pinnacle_game: dict, cs500_games: list) -> tuple[Optional[dict], float]:
         """Fallback: find best match using basic similarity."""
+        exact = exact_canonical_match(pinnacle_game, cs500_games)
+        if exact is not None:
+            return exact, 1.0
+        
         best_match = None
         best_score = 0.0
         
@@ -1,12 +1,37 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import calendar
 import asyncio
 import aiohttp
+import orjson
 import nodriver as uc
 import re
 import os
+import logging
+import tempfile
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Pinnacle API key cached across restarts, so cold starts skip the config round trip
+API_KEY_CACHE_PATH = Path(tempfile.gettempdir()) / "pinnacle_key.json"
+API_KEY_CACHE_TTL = 6 * 60 * 60  # seconds
+
+
+@lru_cache(maxsize=4096)
+def _iso_timestamp(value: str) -> float:
+    """POSIX timestamp of an ISO-8601 string (series and map matchups share start times)."""
+    # Pinnacle's fixed 'YYYY-MM-DDTHH:MM:SSZ' form is sliced directly, without a datetime object
+    if len(value) == 20 and value[19] == 'Z':
+        return float(calendar.timegm((
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19]), 0, 0, 0
+        )))
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
 
 
 class PinnacleScraper:
@@ -18,6 +43,28 @@ class PinnacleScraper:
     def __init__(self):
         """Initialize the scraper."""
         self.api_key = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Request headers built for (base headers dict, API key); rebuilt if either changes
+        self._cached_headers: Optional[Dict[str, str]] = None
+        self._cached_headers_for: Optional[tuple] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared Pinnacle session, creating it on first use (inside the running loop).
+        
+        Keep-alive connections survive between scrapes, so repeat scrapes skip the TCP/TLS handshakes.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared Pinnacle session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
         
     @staticmethod
     def american_to_decimal(american_odds: float) -> float:
@@ -25,51 +72,86 @@ class PinnacleScraper:
         Convert American odds to decimal odds.
         Positive odds: decimal = (american_odds / 100) + 1
         Negative odds: decimal = (100 / abs(american_odds)) + 1
+        Unrounded; the de-vigged market fields are rounded once when they are built.
         """
-        if american_odds > 0:
-            return round((american_odds / 100) + 1, 2)
-        else:
-            return round((100 / abs(american_odds)) + 1, 2)
+        return american_odds / 100 + 1 if american_odds > 0 else 100 / -american_odds + 1
     
-    def get_pinnacle_api_key(self, pinnacle_api_url: str) -> str:
-        """Fetch the API key from Pinnacle's config endpoint."""
-        res = requests.get(pinnacle_api_url)
-        return res.json()["api"]["haywire"]["apiKey"]
+    @staticmethod
+    async def _get_json(session: aiohttp.ClientSession, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        """GET a URL and decode its JSON body with orjson (whatever content type the server sends)."""
+        async with session.get(url, headers=headers) as res:
+            res.raise_for_status()
+            return orjson.loads(await res.read())
     
-    def _setup_headers(self, pinnacle_api_url: str, base_headers: Dict[str, str]) -> Dict[str, str]:
+    async def get_pinnacle_api_key(self, session: aiohttp.ClientSession, pinnacle_api_url: str) -> str:
+        """Fetch the API key from Pinnacle's config endpoint, reusing a recent on-disk copy."""
+        try:
+            cached = orjson.loads(API_KEY_CACHE_PATH.read_bytes())
+            if time.time() - cached['ts'] < API_KEY_CACHE_TTL:
+                return cached['key']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        config = await self._get_json(session, pinnacle_api_url)
+        api_key = config["api"]["haywire"]["apiKey"]
+        try:
+            API_KEY_CACHE_PATH.write_bytes(orjson.dumps({'key': api_key, 'ts': time.time()}))
+        except OSError:
+            pass
+        return api_key
+    
+    def _invalidate_api_key(self):
+        """Forget the API key in memory and on disk, e.g. after Pinnacle rejects it."""
+        self.api_key = None
+        self._cached_headers = None
+        try:
+            API_KEY_CACHE_PATH.unlink(missing_ok=True)
+        except OSError:
+            pass
+    
+    async def _setup_headers(self, session: aiohttp.ClientSession, pinnacle_api_url: str, base_headers: Dict[str, str]) -> Dict[str, str]:
         """Setup headers for API requests."""
         if not self.api_key:
-            self.api_key = self.get_pinnacle_api_key(pinnacle_api_url)
+            self.api_key = await self.get_pinnacle_api_key(session, pinnacle_api_url)
             
-        # Create a copy of base headers and add the API key
-        headers = base_headers.copy()
-        headers["x-api-key"] = self.api_key
-        return headers
+        # Reuse the merged headers while the base headers' contents and the key are unchanged.
+        # Keyed on a snapshot of the items, so an in-place edit or a reused id() can't serve stale headers.
+        cache_key = (tuple(base_headers.items()), self.api_key)
+        if self._cached_headers is None or self._cached_headers_for != cache_key:
+            headers = base_headers.copy()
+            headers["x-api-key"] = self.api_key
+            self._cached_headers = headers
+            self._cached_headers_for = cache_key
+        return self._cached_headers
 
     def get_event_name(self, matchup):
         return matchup.get('league', {}).get('name', '')
 
     def get_start_time(self, matchup):
-        start_time = matchup.get('startTime')
-        return datetime.fromisoformat(start_time.replace('Z', '+00:00')).timestamp()
+        return _iso_timestamp(matchup.get('startTime'))
     
-    def get_matchups(self, matchups_url: str, pinnacle_api_url: str, base_headers: Dict[str, str]) -> Dict[str, Any]:
+    async def get_matchups(self, session: aiohttp.ClientSession, matchups_url: str, pinnacle_api_url: str,
+                           base_headers: Dict[str, str]) -> Dict[str, Any]:
         """Fetch and process matchups for CS2 and League of Legends."""
-        headers = self._setup_headers(pinnacle_api_url, base_headers)
-        res = requests.get(matchups_url, headers=headers)
-
+        headers = await self._setup_headers(session, pinnacle_api_url, base_headers)
+        return self._parse_matchups(await self._get_json(session, matchups_url, headers))
+    
+    def _parse_matchups(self, raw_matchups: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Keep upcoming CS2 and League of Legends matchups with both teams, de-duplicated."""
         matchups = []
         seen_matchups = set()  # Track unique matchups to avoid duplicates
+        now = time.time()
         
-        for matchup in res.json():
-            start_time = self.get_start_time(matchup)
-            if matchup.get('isLive') == 'true' or start_time < time.time():
-                continue
-
-            # Filter by game name - only include CS2 and League of Legends
+        for matchup in raw_matchups:
+            # Filter by game name first - only include CS2 and League of Legends.
+            # Most of the esports feed is other games, so this rejects them before the time parse.
             league_name = self.get_event_name(matchup)
             if 'CS2' not in league_name and 'League of Legends' not in league_name:
                 continue
+            
+            # isLive is a JSON bool, so the old == 'true' compare never matched
+            if matchup.get('isLive') or self.get_start_time(matchup) < now:
+                continue
                 
             matchup_id = None
             participants = None
@@ -86,29 +168,26 @@ class PinnacleScraper:
             
             # Process the match if we found valid participants
             if matchup_id and participants:
-                matchup_data = {
-                    'id': matchup_id,
-                    'event': league_name,
-                    'isLive': matchup.get('isLive'),
-                    'start_time': matchup.get('startTime'),
-                    'home_team': None,
-                    'away_team': None
-                }
-                
-                for team in participants:
-                    if team.get('alignment') == 'home':
-                        matchup_data['home_team'] = team['name']
-                    else:
-                        matchup_data['away_team'] = team['name']
+                # Team names by alignment; any participant not aligned 'home' is the away side
+                by_alignment = {team.get('alignment'): team['name'] for team in participants}
+                home_team = by_alignment.pop('home', None)
+                away_team = next(reversed(by_alignment.values()), None)
                 
                 # Only add if we have both teams and it's not a duplicate
-                if matchup_data['home_team'] and matchup_data['away_team']:
+                if home_team and away_team:
                     # Create a unique key for deduplication
-                    matchup_key = f"{matchup_data['home_team']} vs {matchup_data['away_team']} ({matchup_data['event']})"
+                    matchup_key = (home_team, away_team, league_name)
                     
                     if matchup_key not in seen_matchups:
                         seen_matchups.add(matchup_key)
-                        matchups.append(matchup_data)
+                        matchups.append({
+                            'id': matchup_id,
+                            'event': league_name,
+                            'isLive': matchup.get('isLive'),
+                            'start_time': matchup.get('startTime'),
+                            'home_team': home_team,
+                            'away_team': away_team
+                        })
         
         return {
             'count': len(matchups),
@@ -164,53 +243,80 @@ class PinnacleScraper:
         
         return fair_home, fair_away
 
-    def get_markets(self, markets_url: str, matchups: List[Dict[str, Any]], pinnacle_api_url: str, base_headers: Dict[str, str]) -> Dict[str, Any]:
-        """Fetch and process markets for the given matchups."""
-        headers = self._setup_headers(pinnacle_api_url, base_headers)
-        res = requests.get(markets_url, headers=headers)
+    @staticmethod
+    def devig_both(home_odds: float, away_odds: float, k: float = 1.07) -> tuple[float, float, float, float]:
+        """
+        Power and multiplicative de-vig in one pass over the shared implied probabilities.
+        Returns (power_home, power_away, mult_home, mult_away) fair probabilities, the ones
+        power_method_devig and multiplicative_devig invert into fair odds.
+        """
+        p1 = 1.0 / home_odds
+        p2 = 1.0 / away_odds
+        
+        total = p1 + p2
+        mult_home = p1 / total
+        mult_away = p2 / total
+        
+        p1_k = p1 ** k
+        p2_k = p2 ** k
+        sum_pk = p1_k + p2_k
+        power_home = p1_k / sum_pk
+        power_away = p2_k / sum_pk
+        
+        return power_home, power_away, mult_home, mult_away
 
-        # Create a lookup dictionary for matchup data by ID
-        matchup_lookup = {matchup['id']: matchup for matchup in matchups['matchups']}
+    async def get_markets(self, session: aiohttp.ClientSession, markets_url: str, matchups: Dict[str, Any],
+                          pinnacle_api_url: str, base_headers: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch and process markets for the given matchups."""
+        headers = await self._setup_headers(session, pinnacle_api_url, base_headers)
+        return self._parse_markets(await self._get_json(session, markets_url, headers), matchups)
+    
+    def _parse_markets(self, raw_markets: List[Dict[str, Any]], matchups: Dict[str, Any]) -> Dict[str, Any]:
+        """De-vig the main moneyline market of each known matchup."""
+        # Lookup of only the fields each market needs, by matchup ID
+        matchup_lookup = {
+            m['id']: (m['event'], m['home_team'], m['away_team'], m.get('start_time'))
+            for m in matchups['matchups']
+        }
         markets = []
         
         found_market_ids = set()
 
-        for market in res.json():
+        for market in raw_markets:
             matchup_id = market['matchupId']
             
             # Skip if not a valid matchup or not a main match market
             if matchup_id not in matchup_lookup or '0' not in market['key']:
                 continue
             
-            matchup_data = matchup_lookup[matchup_id]
+            event, home_team, away_team, start_time = matchup_lookup[matchup_id]
             
-            # Extract raw odds from prices
-            home_odds_raw = None
-            away_odds_raw = None
-            
-            for price in market['prices']:
-                if price.get('designation') == 'home':
-                    home_odds_raw = self.american_to_decimal(price['price'])
-                else:
-                    away_odds_raw = self.american_to_decimal(price['price'])
+            # American prices by designation; any price not designated 'home' is the away side
+            prices_by = {price.get('designation'): price['price'] for price in market['prices']}
+            home_american = prices_by.pop('home', None)
+            away_american = next(reversed(prices_by.values()), None)
             
             # Only process if we have both odds
-            if home_odds_raw and away_odds_raw:
-                # Apply both de-vigging methods
-                mult_home, mult_away = self.multiplicative_devig(home_odds_raw, away_odds_raw)
-                power_home, power_away = self.power_method_devig(home_odds_raw, away_odds_raw)
+            if home_american is not None and away_american is not None:
+                home_odds_raw = self.american_to_decimal(home_american)
+                away_odds_raw = self.american_to_decimal(away_american)
                 
-                # Calculate the actual fair probabilities (these will sum to exactly 100%)
-                power_home_prob = 1.0 / power_home
-                power_away_prob = 1.0 / power_away
-                mult_home_prob = 1.0 / mult_home
-                mult_away_prob = 1.0 / mult_away
+                # Apply both de-vigging methods (fair probabilities, each pair sums to exactly 100%)
+                power_home_prob, power_away_prob, mult_home_prob, mult_away_prob = self.devig_both(
+                    home_odds_raw, away_odds_raw
+                )
+                
+                # Fair odds are the inverse probabilities
+                power_home = 1.0 / power_home_prob
+                power_away = 1.0 / power_away_prob
+                mult_home = 1.0 / mult_home_prob
+                mult_away = 1.0 / mult_away_prob
                 
                 market_data = {
                     'id': matchup_id,
-                    'event': matchup_data['event'],
-                    'home_team': matchup_data['home_team'],
-                    'away_team': matchup_data['away_team'],
+                    'event': event,
+                    'home_team': home_team,
+                    'away_team': away_team,
                     'home_fair_odds': round(power_home, 2),  # Power method (default)
                     'away_fair_odds': round(power_away, 2),  # Power method (default)
                     'home_mult_odds': round(mult_home, 2),  # Multiplicative method
@@ -219,7 +325,7 @@ class PinnacleScraper:
                     'away_fair_prob': round(power_away_prob, 6),  # Store exact probability
                     'home_mult_prob': round(mult_home_prob, 6),  # Store exact probability
                     'away_mult_prob': round(mult_away_prob, 6),  # Store exact probability
-                    'start_time': matchup_data.get('start_time')
+                    'start_time': start_time
                 }
                 
                 found_market_ids.add(matchup_id)
@@ -230,11 +336,40 @@ class PinnacleScraper:
             'markets': markets
         }
     
-    def scrape_data(self, pinnacle_api_url: str, matchups_url: str, markets_url: str, base_headers: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Main method to scrape all data - matchups and markets."""
-        matchups = self.get_matchups(matchups_url, pinnacle_api_url, base_headers)
-        markets = self.get_markets(markets_url, matchups, pinnacle_api_url, base_headers)
-        return markets
+    async def scrape_data(self, pinnacle_api_url: str, matchups_url: str, markets_url: str, base_headers: Dict[str, str]) -> Dict[str, Any]:
+        """Main method to scrape all data - matchups and markets.
+        
+        Both feeds only need the API key, so they are fetched concurrently over the shared
+        keep-alive session and parsed once both have arrived.
+        """
+        session = self._get_session()
+        for attempt in range(2):
+            headers = await self._setup_headers(session, pinnacle_api_url, base_headers)
+            try:
+                raw_matchups, raw_markets = await asyncio.gather(
+                    self._get_json(session, matchups_url, headers),
+                    self._get_json(session, markets_url, headers)
+                )
+                break
+            except aiohttp.ClientResponseError as e:
+                # A cached key may have been rotated; fetch a fresh one and retry once
+                if e.status not in (401, 403) or attempt:
+                    raise
+                self._invalidate_api_key()
+        matchups = self._parse_matchups(raw_matchups)
+        return self._parse_markets(raw_markets, matchups)
+
+# Concurrent CS500 market requests (and pooled connections to the market API)
+MARKET_FETCH_WORKERS = 10
+# Numeric match ID at the end of a CS500 event href
+_HREF_RE = re.compile(r'-(\d+)$')
+# Event-card hrefs under a CS500 shadow root, read in the page rather than node by node
+_CARD_HREFS_JS = """(root) => Array.from(
+    root.querySelectorAll('[data-editor-id="eventCardContent"]'), (a) => a.getAttribute('href')
+)"""
+# Proxies already checked by CS500Scraper._test_proxy in this process
+_TESTED_PROXIES: set = set()
+
 
 class CS500Scraper:
 
@@ -251,12 +386,17 @@ class CS500Scraper:
         self.lol_path = "https://csgo500.com/sports?bt-path=%2Fleague-of-legends-110"
         self.cs2_path = "https://csgo500.com/sports?bt-path=%2Fcounter-strike-109"
         self.match_ids = set()  # Set to store extracted match IDs
+        # Keep-alive HTTP session for market API calls, reused across scrapes
+        self._session: Optional[requests.Session] = None
         
         # Get proxy from parameter or environment variable
         self.proxy_server = proxy_server or os.getenv('PROXY_SERVER')
         if self.proxy_server:
             print(f"🌐 Using proxy: {self.proxy_server}")
-            self._test_proxy()
+            # The check blocks for up to 10s, so each proxy is only tested once per process
+            if self.proxy_server not in _TESTED_PROXIES:
+                _TESTED_PROXIES.add(self.proxy_server)
+                self._test_proxy()
     
     def _test_proxy(self):
         """Test if proxy is accessible."""
@@ -290,14 +430,11 @@ class CS500Scraper:
         Returns:
             The extracted numeric ID as a string, or None if no match found
         """
-        # Use regex to find the numeric ID at the end of the href
-        # Pattern matches digits at the end of the string after a dash or at the end
-        match = re.search(r'-(\d+)$', href)
-        if match:
-            return match.group(1)
-        return None
-
-    def add_match_id_to_set(self, href: str) -> bool:
+        # Numeric ID at the end of the href, after a dash
+        match = _HREF_RE.search(href)
+        return match.group(1) if match else None
+
+    def add_match_id_to_set(self, href: str) -> Optional[str]:
         """
         Extract match ID from href and add it to the set.
         
@@ -305,13 +442,12 @@ class CS500Scraper:
             href: The href URL string
             
         Returns:
-            True if a match ID was found and added, False otherwise
+            The match ID that was added, or None if the href has none (truthiness as before)
         """
         match_id = self.extract_match_id_from_href(href)
         if match_id:
             self.match_ids.add(match_id)
-            return True
-        return False
+        return match_id
 
     def get_all_match_ids(self) -> set:
         """
@@ -326,19 +462,160 @@ class CS500Scraper:
         """Clear all collected match IDs."""
         self.match_ids.clear()
 
-    async def fetch_matchids(self, links):
-        for link in links:
-            href = link.attrs['href']
-            if self.add_match_id_to_set(href):
-                match_id = self.extract_match_id_from_href(href)
-                print(f"Added match ID: {match_id}")
+    async def _card_hrefs(self, root) -> List[str]:
+        """Return the hrefs of every event card under the shadow root, in one CDP call."""
+        return await root.apply(_CARD_HREFS_JS) or []
+
+    async def fetch_matchids(self, hrefs: List[str]) -> set:
+        """Return the match IDs found in a page of event-card hrefs."""
+        ids = set()
+        add = ids.add
+        for href in hrefs:
+            match_id = self.extract_match_id_from_href(href)
+            if match_id:
+                add(match_id)
+                logger.debug("Found match ID: %s", match_id)
             else:
-                print(f"No match ID found in href: {href}")
+                logger.debug("No match ID found in href: %s", href)
+        logger.info("Found %d match IDs in %d links", len(ids), len(hrefs))
+        return ids
 
-    async def get_matchids(self):
-        """Scrape match IDs for LoL and CS2 together. Returns a set of IDs."""
-        games: List[str] = ["lol", "cs2"]
+    async def _scrape_game(self, browser, path: str, name: str) -> set:
+        """
+        Scrape the match IDs for one game path in its own browser tab.
+        
+        Args:
+            browser: The running nodriver browser
+            path: The CS500 page URL for the game
+            name: Short game name used in log lines ('lol' or 'cs2')
+            
+        Returns:
+            Set of match IDs found on the page
+        """
+        found = set()
 
+        try:
+            print(f"🌐 [{name}] Navigating to: {path}")
+            page = await browser.get(path, new_tab=True)
+            print(f"✅ [{name}] Page navigation started")
+
+        except Exception as e:
+            print(f"❌ [{name}] Failed to navigate: {e}")
+            return found
+
+        # Check for unavailable page with proper error handling.
+        # select() polls until the element appears, so this also covers the initial page load.
+        try:
+            unavailable_element = await page.select('div.unavailable', timeout=5)
+            if unavailable_element:
+                print(f"⚠️ [{name}] Page is unavailable")
+                return found
+        except Exception as e:
+            print(f"⚠️ [{name}] Error checking for unavailable element: {e}")
+
+        # Add retry logic for the main scraping
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                print(f"🔍 [{name}] Attempt {attempt + 1}/{max_retries}: Waiting for page to load...")
+
+                # Wait for the betting widget itself rather than a fixed render delay
+                try:
+                    await page.wait_for('#betby', timeout=15)
+                    print(f"✅ [{name}] #betby element found, looking for host...")
+                except Exception as e:
+                    print(f"⚠️ [{name}] #betby not found: {e}")
+                    # Try to continue anyway - element might not be required
+
+                # Try to find the host element with shadow DOM
+                host = await page.select('div[style*="background-color: rgb(30, 28, 37)"]')
+
+                if not host:
+                    print(f"⚠️ [{name}] Host element not found, attempt {attempt + 1}/{max_retries}")
+                    if attempt < max_retries - 1:
+                        print(f"⏳ [{name}] Waiting 3 seconds before retry...")
+                        await asyncio.sleep(3)
+                        # Try navigating to the page again
+                        print(f"🔄 [{name}] Re-navigating to page...")
+                        await page.get(path)
+                        continue
+                    else:
+                        print(f"❌ [{name}] Failed to find host element after all retries")
+                        print(f"💡 [{name}] CS500 page structure may have changed")
+                        break
+
+                print(f"✅ [{name}] Host element found, accessing shadow DOM...")
+
+                try:
+                    await host.update()
+                    if not host.shadow_children or len(host.shadow_children) == 0:
+                        print(f"⚠️ [{name}] No shadow children found")
+                        continue
+
+                    root = host.shadow_children[0]
+                    print(f"✅ [{name}] Shadow root accessed")
+                except Exception as e:
+                    print(f"❌ [{name}] Shadow DOM access failed: {e}")
+                    continue
+
+                # Event cards render into the shadow root after it attaches; poll up to ~12s
+                for _ in range(24):
+                    links = await self._card_hrefs(root)
+                    if links:
+                        break
+                    await asyncio.sleep(0.5)
+                print(f"🎯 [{name}] Found {len(links)} match links")
+
+                if len(links) == 0:
+                    print(f"⚠️ [{name}] No match links found - CS500 may have no events")
+                    break
+
+                found |= await self.fetch_matchids(links)
+
+
+                # One paginator query per page; arrows[1] is the "next" arrow
+                while True:
+                    arrows = await root.query_selector_all('[data-editor-id="eventCardPaginatorArrow"]')
+                    if len(arrows) < 2 or arrows[1].attrs.get('class_') != 'sc-abe19l-0 eoRqPp':
+                        print("No more pages available - pagination complete")
+                        break
+
+                    print("Clicking button")
+                    await arrows[1].click()
+
+                    links = await self._card_hrefs(root)
+                    found |= await self.fetch_matchids(links)
+                    print(f"Successfully scraped page")
+
+                # Completed this game path
+                break  # Success, exit retry loop for this path
+
+            except Exception as e:
+                print(f"❌ [{name}] Attempt {attempt + 1}/{max_retries} failed: {e}")
+                if attempt < max_retries - 1:
+                    print(f"⏳ [{name}] Waiting 5 seconds before retry...")
+                    await asyncio.sleep(5)  # Longer wait for proxy
+                    # Try navigating to the page again
+                    try:
+                        print(f"🔄 [{name}] Reloading page...")
+                        await page.reload()
+                    except:
+                        pass
+                else:
+                    print(f"💀 [{name}] All attempts failed. Possible causes:")
+                    print(f"   - Proxy is too slow or blocked")
+                    print(f"   - CS500 is down or changed layout")
+                    print(f"   - Page requires longer load time")
+                    break
+
+        return found
+
+    async def get_matchids(self):
+        """Scrape match IDs for LoL and CS2 together. Returns a set of IDs.
+        
+        Both games are scraped concurrently in separate tabs, so the wait is the slower page
+        rather than the sum of both.
+        """
         try:
             # Try headless mode with stealth configurations
             # nodriver has built-in anti-detection that works in headless
@@ -391,129 +668,11 @@ class CS500Scraper:
             print("This might be due to running in a server environment without display support")
             return set()
         try:
-            for g in games:
-                path = self.lol_path if g == "lol" else self.cs2_path
-                try:
-                    print(f"🌐 [{g}] Navigating to: {path}")
-                    page = await browser.get(path)
-                    print(f"✅ [{g}] Page navigation started")
-                    
-                    # Give page time to start loading
-                    await asyncio.sleep(3)
-                    
-                except Exception as e:
-                    print(f"❌ [{g}] Failed to navigate: {e}")
-                    continue
-
-                # Check for unavailable page with proper error handling
-                try:
-                    unavailable_element = await page.select('div.unavailable')
-                    if unavailable_element:
-                        print(f"⚠️ [{g}] Page is unavailable")
-                        continue
-                except Exception as e:
-                    print(f"⚠️ [{g}] Error checking for unavailable element: {e}")
-
-                # Add retry logic for the main scraping
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        print(f"🔍 [{g}] Attempt {attempt + 1}/{max_retries}: Waiting for page to load...")
-                        
-                        # Wait for page to fully render
-                        await asyncio.sleep(8)
-                        
-                        # Check if #betby element exists
-                        try:
-                            await page.wait_for('#betby', timeout=15)
-                            print(f"✅ [{g}] #betby element found, looking for host...")
-                        except Exception as e:
-                            print(f"⚠️ [{g}] #betby not found: {e}")
-                            # Try to continue anyway - element might not be required
-                        
-                        # Try to find the host element with shadow DOM
-                        host = await page.select('div[style*="background-color: rgb(30, 28, 37)"]')
-                        
-                        if not host:
-                            print(f"⚠️ [{g}] Host element not found, attempt {attempt + 1}/{max_retries}")
-                            if attempt < max_retries - 1:
-                                print(f"⏳ [{g}] Waiting 10 seconds before retry...")
-                                await asyncio.sleep(10)
-                                # Try navigating to the page again
-                                print(f"🔄 [{g}] Re-navigating to page...")
-                                await page.get(path)
-                                continue
-                            else:
-                                print(f"❌ [{g}] Failed to find host element after all retries")
-                                print(f"💡 [{g}] CS500 page structure may have changed")
-                                break
-                        
-                        print(f"✅ [{g}] Host element found, accessing shadow DOM...")
-                        
-                        try:
-                            await host.update()
-                            if not host.shadow_children or len(host.shadow_children) == 0:
-                                print(f"⚠️ [{g}] No shadow children found")
-                                continue
-                            
-                            root = host.shadow_children[0]
-                            print(f"✅ [{g}] Shadow root accessed")
-                        except Exception as e:
-                            print(f"❌ [{g}] Shadow DOM access failed: {e}")
-                            continue
-
-                        links = await root.query_selector_all('[data-editor-id="eventCardContent"]')
-                        print(f"🎯 [{g}] Found {len(links)} match links")
-                        
-                        if len(links) == 0:
-                            print(f"⚠️ [{g}] No match links found - CS500 may have no events")
-                            break
-                        
-                        await self.fetch_matchids(links)
-
-
-                        pagination_button = await root.query_selector_all('[data-editor-id="eventCardPaginatorArrow"]')
-                        if pagination_button:
-                            continue_pagination = True
-                        else:
-                            print("No additional pages available")
-                            continue_pagination = False
-                        
-                        while continue_pagination:
-                            pagination_button = await root.query_selector_all('[data-editor-id="eventCardPaginatorArrow"]')
-
-                            if pagination_button[1].attrs['class_'] == 'sc-abe19l-0 eoRqPp':
-                                print("Clicking button")
-                                await pagination_button[1].click()
-
-                                links = await root.query_selector_all('[data-editor-id="eventCardContent"]')
-                                await self.fetch_matchids(links)
-                                print(f"Successfully scraped page")
-                            else:
-                                print("No more pages available - pagination complete")
-                                continue_pagination = False
-                                break
-                        
-                        # Completed this game path
-                        break  # Success, exit retry loop for this path
-                        
-                    except Exception as e:
-                        print(f"❌ [{g}] Attempt {attempt + 1}/{max_retries} failed: {e}")
-                        if attempt < max_retries - 1:
-                            print(f"⏳ [{g}] Waiting 5 seconds before retry...")
-                            await asyncio.sleep(5)  # Longer wait for proxy
-                            # Try navigating to the page again
-                            try:
-                                print(f"🔄 [{g}] Reloading page...")
-                                await page.reload()
-                            except:
-                                pass
-                        else:
-                            print(f"💀 [{g}] All attempts failed. Possible causes:")
-                            print(f"   - Proxy is too slow or blocked")
-                            print(f"   - CS500 is down or changed layout")
-                            print(f"   - Page requires longer load time")
-                            break
+            results = await asyncio.gather(
+                self._scrape_game(browser, self.lol_path, "lol"),
+                self._scrape_game(browser, self.cs2_path, "cs2"),
+            )
+            self.match_ids.update(*results)
 
             # Print and return all collected match IDs
             all_ids = self.get_all_match_ids()
@@ -527,6 +686,55 @@ class CS500Scraper:
         finally:
             browser.stop()
 
+    def _get_session(self) -> requests.Session:
+        """Return the shared market-API session, creating it on first use.
+        
+        Connections stay open between scrapes, so repeat scrapes skip the TCP/TLS handshakes.
+        The pool holds one connection per fetch worker.
+        """
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MARKET_FETCH_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            
+            # Define headers for API requests
+            headers = {
+                "Accept": "*/*",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "Host": "api-h-c7818b61-608.sptpub.com",
+                "Origin": "https://csgo500.com",
+                "Pragma": "no-cache",
+                "Referer": "https://csgo500.com/",
+                "Sec-Fetch-Dest": "empty",
+                "Sec-Fetch-Mode": "cors",
+                "Sec-Fetch-Site": "cross-site",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36",
+                "sec-ch-ua": '"Chromium";v="140", "Not=A?Brand";v="24", "Google Chrome";v="140"',
+                "sec-ch-ua-mobile": "?0",
+                "sec-ch-ua-platform": '"Windows"'
+            }
+            session.headers.update(headers)
+            
+            # Setup proxy for requests library (handles HTTPS proxies properly)
+            if self.proxy_server:
+                session.proxies = {
+                    'http': self.proxy_server,
+                    'https': self.proxy_server
+                }
+                print(f"🌐 Using proxy for market API calls: {self.proxy_server[:50]}...")
+            self._session = session
+        return self._session
+    
+    def close(self):
+        """Close the shared market-API session."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
     async def get_markets(self, match_ids: List[str]) -> List[Dict[str, Any]]:
         """
         Fetch markets for all match IDs using requests library (better proxy support).
@@ -539,51 +747,27 @@ class CS500Scraper:
         """
         if not match_ids:
             return []
+        # Snapshot on the event loop: callers may pass a live set that keeps growing while the
+        # worker thread below iterates it
+        match_ids = list(match_ids)
         
-        # Define headers for API requests
-        headers = {
-            "Accept": "*/*",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Host": "api-h-c7818b61-608.sptpub.com",
-            "Origin": "https://csgo500.com",
-            "Pragma": "no-cache",
-            "Referer": "https://csgo500.com/",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "cross-site",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36",
-            "sec-ch-ua": '"Chromium";v="140", "Not=A?Brand";v="24", "Google Chrome";v="140"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"'
-        }
-        
-        # Setup proxy for requests library (handles HTTPS proxies properly)
-        proxies = None
-        if self.proxy_server:
-            proxies = {
-                'http': self.proxy_server,
-                'https': self.proxy_server
-            }
-            print(f"🌐 Using proxy for market API calls: {self.proxy_server[:50]}...")
+        session = self._get_session()
         
         def fetch_single_market_sync(match_id: str) -> Optional[Dict[str, Any]]:
             """Fetch market data for a single match ID (synchronous)."""
             try:
                 url = f"{self.base_url}/{match_id}"
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    proxies=proxies,
-                    timeout=30,
-                    verify=True  # Verify SSL certificates
-                )
+                # Per-request proxies so environment proxy settings can't override ours
+                response = session.get(url, proxies=session.proxies, timeout=30)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    # orjson parses the nested events/tournaments payload much faster than json
+                    data = orjson.loads(response.content)
                     return self._parse_market_data(data, match_id)
+                elif response.status_code in (429, 503):
+                    # Throttled: a sign MARKET_FETCH_WORKERS is too high for the API/proxy
+                    print(f"🐢 Rate limited fetching market {match_id}: HTTP {response.status_code}")
+                    return None
                 else:
                     print(f"⚠️ Failed to fetch market {match_id}: HTTP {response.status_code}")
                     return None
@@ -600,23 +784,29 @@ class CS500Scraper:
         # Use ThreadPoolExecutor to run synchronous requests concurrently
         from concurrent.futures import ThreadPoolExecutor, as_completed
         
-        markets = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # Submit all tasks
-            future_to_match_id = {
-                executor.submit(fetch_single_market_sync, match_id): match_id 
-                for match_id in match_ids
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_match_id):
-                try:
-                    result = future.result()
-                    if result:
-                        markets.append(result)
-                except Exception as e:
-                    match_id = future_to_match_id[future]
-                    print(f"Exception for match {match_id}: {e}")
+        def fetch_all_markets_sync() -> List[Dict[str, Any]]:
+            """Fetch every market with at most MARKET_FETCH_WORKERS requests in flight."""
+            markets = []
+            with ThreadPoolExecutor(max_workers=MARKET_FETCH_WORKERS) as executor:
+                # Submit all tasks
+                future_to_match_id = {
+                    executor.submit(fetch_single_market_sync, match_id): match_id 
+                    for match_id in match_ids
+                }
+                
+                # Collect results as they complete
+                for future in as_completed(future_to_match_id):
+                    try:
+                        result = future.result()
+                        if result:
+                            markets.append(result)
+                    except Exception as e:
+                        match_id = future_to_match_id[future]
+                        print(f"Exception for match {match_id}: {e}")
+            return markets
+        
+        # Wait for the pool off the event loop so the API keeps serving during a scrape
+        markets = await asyncio.to_thread(fetch_all_markets_sync)
         
         # Sort by start_time
         markets.sort(key=lambda x: x.get('start_time', 0))
@@ -636,26 +826,27 @@ class CS500Scraper:
         """
         try:
             root = data['events'][match_id]
-            tournament = root['desc']['tournament']
+            desc = root['desc']
+            competitors = desc['competitors']
             market_info = {
                 'match_id': match_id,
-                'event_name': data['tournaments'][tournament]['name'],
-                'start_time': root['desc']['scheduled'],
-                'home_team': root['desc']['competitors'][0]['name'],
-                'away_team': root['desc']['competitors'][1]['name'],
+                'event_name': data['tournaments'][desc['tournament']]['name'],
+                'start_time': desc['scheduled'],
+                'home_team': competitors[0]['name'],
+                'away_team': competitors[1]['name'],
                 'status': root['state']['status'],
                 'markets': []
             }
             
-            if 'markets' in root:
-                for market in root['markets']:
-                    if market == '186':
-                         moneyline_data = {
-                             'name': 'moneyline',
-                             'home odds': root['markets'][market]['']['4']['k'],
-                             'away odds': root['markets'][market]['']['5']['k']
-                         }
-                         market_info['markets'].append(moneyline_data)
+            # Market '186' is the match winner (moneyline); outcomes '4'/'5' are home/away
+            moneyline = root.get('markets', {}).get('186')
+            if moneyline:
+                outcomes = moneyline['']
+                market_info['markets'].append({
+                    'name': 'moneyline',
+                    'home odds': outcomes['4']['k'],
+                    'away odds': outcomes['5']['k']
+                })
             
             return market_info
             
@@ -2,5 +2,6 @@
 
 # Start the FastAPI application with headless browser support
 echo "🚀 Starting FastAPI application (headless mode)..."
-exec uvicorn api:app --host 0.0.0.0 --port ${PORT:-8000}
+# uvloop ships with uvicorn[standard]; pin it so a missing wheel fails loudly instead of falling back to asyncio
+exec uvicorn api:app --host 0.0.0.0 --port ${PORT:-8000} --loop uvloop
 